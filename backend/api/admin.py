@@ -4,17 +4,29 @@ from .modules.memory.models import Memory
 from .modules.user.models import User
 from .modules.medical_log.models import MedicalLog
 from .modules.medical_appointment.models import MedicalAppointment
-from .modules.safe_zone.models import SafeZone
+from .modules.safe_zone.models import SafeZone, LocationTrack
 from .modules.caregiver_log.models import CaregiverLog
-from .modules.achievements.models import Achievement
+from .modules.achievements.models import AchievementDefinition, AchievementUnlock
 from .modules.support_request.models import SupportRequest
+from .modules.notifications.models import PushNotification
+from .modules.matching.models import CaregiverAvailability
+from .modules.media.models import MediaBlob
+from .modules.activities.models import ActivityRollup, ActivitySummary, ActivityTrend
 
 admin.site.register(Memory)
 admin.site.register(User)
 admin.site.register(MedicalLog)
 admin.site.register(MedicalAppointment)
 admin.site.register(SafeZone)
+admin.site.register(LocationTrack)
 admin.site.register(Card) 
 admin.site.register(CaregiverLog)
-admin.site.register(Achievement)
+admin.site.register(AchievementDefinition)
+admin.site.register(AchievementUnlock)
 admin.site.register(SupportRequest)
+admin.site.register(PushNotification)
+admin.site.register(CaregiverAvailability)
+admin.site.register(MediaBlob)
+admin.site.register(ActivityRollup)
+admin.site.register(ActivitySummary)
+admin.site.register(ActivityTrend)
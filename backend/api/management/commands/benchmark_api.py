@@ -0,0 +1,115 @@
+import json
+import random
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from api.modules.benchmark.runner import BenchmarkRunner
+from api.modules.benchmark.seed import is_seeded, seed
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway database and benchmark the API hot paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=1000,
+                            help='Patients to seed (each gets one caregiver)')
+        parser.add_argument('--points', type=int, default=1000,
+                            help='Location points per patient')
+        parser.add_argument('--cards', type=int, default=20,
+                            help='Cards per patient')
+        parser.add_argument('--support-requests', type=int, default=5,
+                            help='Support requests per caregiver')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=20,
+                            help='Unmeasured requests per endpoint')
+        parser.add_argument('--users', type=int, default=50,
+                            help='Distinct users the requests are spread over')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for data and request mix')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database and reuse its data on the next run')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            # Alerts are never delivered and rate limits would measure 429s instead of the endpoints
+            with override_settings(PUSH_DISPATCH_INLINE=False, METRICS_SLOW_REQUEST_MS=None, RATE_LIMITS={}):
+                results = self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n✓ Results written to {options["output"]}'))
+
+    def benchmark(self, options):
+        rng = random.Random(options['seed'])
+
+        if is_seeded():
+            self.stdout.write('Reusing seeded data from the kept database')
+            dataset = None
+        else:
+            self.stdout.write('Seeding benchmark data...')
+            started = timezone.now()
+            dataset = seed(
+                options['patients'],
+                options['points'],
+                options['cards'],
+                options['support_requests'],
+                rng=rng,
+                log=self.stdout.write
+            )
+            self.stdout.write(f'  done in {(timezone.now() - started).total_seconds():.1f}s')
+
+        runner = BenchmarkRunner(users=options['users'], rng=rng)
+        names = options['endpoints'] or list(runner.scenarios())
+        unknown = set(names) - set(runner.scenarios())
+        if unknown:
+            raise ValueError(f'Unknown endpoints: {", ".join(sorted(unknown))}')
+
+        endpoints = {}
+        self.stdout.write(
+            f'\n{"endpoint":<18} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"errors":>7}'
+        )
+        for name in names:
+            summary = runner.run(name, options['requests'], warmup=options['warmup'])
+            endpoints[name] = summary
+            latency = summary['latency_ms']
+            self.stdout.write(
+                f'{name:<18} {summary["throughput_rps"]:>8} {latency["p50"]:>8} {latency["p95"]:>8} '
+                f'{latency["p99"]:>8} {summary["queries"]["mean"]:>8} {summary["errors"]:>7}'
+            )
+
+        return {
+            'commit': self.git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': dataset,
+            'options': {
+                key: options[key]
+                for key in ('patients', 'points', 'cards', 'support_requests', 'requests', 'warmup', 'users', 'seed')
+            },
+            'endpoints': endpoints,
+        }
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.modules.media.blobs import GC_GRACE_SECONDS, collect_unreferenced
+
+
+class Command(BaseCommand):
+    help = 'Delete media blobs that no longer have references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-seconds', type=int, default=GC_GRACE_SECONDS,
+                            help='Keep blobs released more recently than this')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Blobs examined per batch')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            deleted = collect_unreferenced(options['grace_seconds'], options['batch_size'])
+            total += deleted
+            if deleted < options['batch_size']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Deleted {total} unreferenced media blobs'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from api.modules.safe_zone.models import LocationHistory
+from api.modules.safe_zone.retention import (
+    get_retention,
+    raw_cutoff,
+    compact_user_history,
+    expire_tracks,
+)
+
+
+class Command(BaseCommand):
+    help = 'Downsample old location history into tracks and expire old tracks'
+
+    def add_arguments(self, parser):
+        retention = get_retention()
+        parser.add_argument('--raw-days', type=int, default=retention['RAW_DAYS'],
+                            help='Days of raw points to keep')
+        parser.add_argument('--bucket-seconds', type=int, default=retention['TRACK_BUCKET_SECONDS'],
+                            help='Width of each downsampled bucket')
+        parser.add_argument('--track-days', type=int, default=retention['TRACK_DAYS'],
+                            help='Days of downsampled tracks to keep')
+
+    def handle(self, *args, **options):
+        bucket_seconds = options['bucket_seconds']
+        cutoff = raw_cutoff(options['raw_days'], bucket_seconds)
+
+        user_ids = list(
+            LocationHistory.objects.filter(timestamp__lt=cutoff)
+            .order_by().values_list('user_id', flat=True).distinct()
+        )
+        self.stdout.write(f'Compacting points older than {cutoff:%Y-%m-%d %H:%M} for {len(user_ids)} patients')
+
+        total_tracks = 0
+        total_deleted = 0
+        for index, user_id in enumerate(user_ids, start=1):
+            tracks, deleted = compact_user_history(user_id, cutoff, bucket_seconds)
+            total_tracks += tracks
+            total_deleted += deleted
+            self.stdout.write(f'  [{index}/{len(user_ids)}] user {user_id}: {deleted} points -> {tracks} buckets')
+
+        expired = expire_tracks(options['track_days'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✓ Compaction complete! {total_deleted} raw points -> {total_tracks} buckets, '
+                f'{expired} expired buckets deleted.'
+            )
+        )
@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from api.modules.activities.models import ActivitySummary, ActivityTrend
+from api.modules.activities.trends import compute_batch, stale_filter
+
+
+class Command(BaseCommand):
+    help = 'Recompute activity score trends (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every trend, not only stale ones (new plays or computed before today)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes for the computation')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='(user, game) pairs loaded and saved per batch')
+
+    def handle(self, *args, **options):
+        pairs = set(ActivitySummary.objects.values_list('user_id', 'game'))
+        if not options['all']:
+            fresh = set(ActivityTrend.objects.exclude(stale_filter()).values_list('user_id', 'game'))
+            pairs -= fresh
+        pairs = sorted(pairs)
+        self.stdout.write(f"Computing {len(pairs)} trends with {options['workers']} workers")
+
+        total = 0
+        batch_size = options['batch_size']
+        pool = ProcessPoolExecutor(max_workers=options['workers']) if options['workers'] > 1 and pairs else None
+        try:
+            for start in range(0, len(pairs), batch_size):
+                total += compute_batch(pairs[start:start + batch_size], executor=pool)
+                self.stdout.write(f'  {total}/{len(pairs)}')
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        declining = ActivityTrend.objects.filter(declining=True).count()
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✓ {total} trends computed; {declining} patient games are declining.')
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.modules.achievements.catalog import sync_catalog
+from api.modules.achievements.models import AchievementDefinition, AchievementUnlock
+
+
+class Command(BaseCommand):
+    help = 'Create or update the achievement catalog from ACHIEVEMENT_DEFINITIONS'
+
+    def handle(self, *args, **options):
+        written = sync_catalog()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✓ Catalog synced! {written} definitions written; '
+                f'{AchievementDefinition.objects.count()} in the catalog, '
+                f'{AchievementUnlock.objects.count()} unlocks recorded.'
+            )
+        )
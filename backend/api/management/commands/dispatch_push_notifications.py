@@ -0,0 +1,27 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from api.modules.notifications.push_service import drain
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued push notifications through Expo in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Concurrent dispatch threads')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='push-dispatch') as pool:
+            while True:
+                processed = sum(pool.map(lambda _: drain(), range(workers)))
+                if processed:
+                    self.stdout.write(self.style.SUCCESS(f'✓ Processed {processed} notifications'))
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
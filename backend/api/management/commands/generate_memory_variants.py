@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from api.modules.memory.images import process_memory
+from api.modules.memory.models import Memory
+
+
+class Command(BaseCommand):
+    help = 'Generate resized image variants for memories that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate variants for every memory with an image')
+
+    def handle(self, *args, **options):
+        memories = Memory.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            memories = memories.filter(image_variants={})
+
+        memory_ids = list(memories.order_by('created_at').values_list('memory_id', flat=True))
+        self.stdout.write(f'Generating variants for {len(memory_ids)} memories')
+
+        generated = 0
+        for index, memory_id in enumerate(memory_ids, start=1):
+            if process_memory(memory_id):
+                generated += 1
+            else:
+                self.stdout.write(self.style.WARNING(f'  [{index}/{len(memory_ids)}] memory {memory_id} skipped'))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✓ Variants generated for {generated}/{len(memory_ids)} memories.')
+        )
@@ -0,0 +1,52 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.modules.media.avatars import main_variant, store_avatar
+from api.modules.media.blobs import is_blob
+from api.modules.media.processing import DECODE_ERRORS
+from api.modules.user.authentication import bump_user_version
+from api.modules.user.models import User
+
+
+class PictureChanged(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Convert profile pictures uploaded before normalization into media blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-originals', action='store_true',
+                            help='Do not delete the original files once converted')
+
+    def handle(self, *args, **options):
+        users = list(
+            User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .exclude(profile_picture__startswith='blobs/').only('id', 'profile_picture')
+        )
+        self.stdout.write(f'Normalizing {len(users)} profile pictures')
+
+        converted = 0
+        for index, user in enumerate(users, start=1):
+            original = user.profile_picture.name
+            try:
+                with transaction.atomic():
+                    variants = store_avatar(user.profile_picture)
+                    # Only if the user didn't upload a new picture meanwhile
+                    updated = User.objects.filter(pk=user.pk, profile_picture=original).update(
+                        profile_picture=main_variant(variants),
+                        profile_picture_variants=variants
+                    )
+                    if not updated:
+                        raise PictureChanged('picture changed meanwhile')
+            except (PictureChanged, FileNotFoundError, *DECODE_ERRORS) as e:
+                self.stdout.write(self.style.WARNING(f'  [{index}/{len(users)}] user {user.pk} skipped: {e}'))
+                continue
+
+            converted += 1
+            bump_user_version(user.pk)
+            if not options['keep_originals'] and not is_blob(original):
+                default_storage.delete(original)
+
+        self.stdout.write(self.style.SUCCESS(f'\n✓ {converted}/{len(users)} profile pictures normalized.'))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tokens deleted per transaction')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Seconds between runs')
+        parser.add_argument('--once', action='store_true', help='Run once and exit')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        while True:
+            deleted = self.purge(batch_size)
+            if deleted:
+                self.stdout.write(self.style.SUCCESS(f'✓ Purged {deleted} expired tokens'))
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def purge(self, batch_size):
+        now = timezone.now()
+        total = 0
+        while True:
+            # Short transactions so token refreshes are never blocked for long
+            with transaction.atomic():
+                ids = list(
+                    OutstandingToken.objects.filter(expires_at__lt=now)
+                    .order_by('id').values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    return total
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.modules.activities.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the activity rollups and summaries from the raw plays'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        scope = f"{len(options['user_ids'])} users" if options['user_ids'] else 'all users'
+        self.stdout.write(f'Rebuilding activity statistics for {scope}')
+
+        rollups, summaries = rebuild(options['user_ids'], options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✓ Rebuild complete! {rollups} rollups and {summaries} summaries written.')
+        )
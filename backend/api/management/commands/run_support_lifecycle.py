@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.modules.support_request.lifecycle import BATCH_SIZE, close_expired
+
+
+class Command(BaseCommand):
+    help = 'Finalize or cancel support requests whose window has ended'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between runs')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Requests closed per transaction')
+        parser.add_argument('--once', action='store_true', help='Run once and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                closed = close_expired(batch_size=max(1, options['batch_size']))
+            finally:
+                close_old_connections()
+            if closed:
+                self.stdout.write(self.style.SUCCESS(f'✓ Closed {closed} support requests'))
+            if options['once']:
+                break
+            time.sleep(options['interval'])
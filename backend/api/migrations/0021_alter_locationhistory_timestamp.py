@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_safezone_safe_exit_active'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='locationhistory',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
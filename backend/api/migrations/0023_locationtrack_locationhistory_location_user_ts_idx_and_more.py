@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_pushnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationTrack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('bucket_seconds', models.PositiveIntegerField()),
+                ('latitude_e6', models.IntegerField()),
+                ('longitude_e6', models.IntegerField()),
+                ('sample_count', models.PositiveIntegerField()),
+                ('is_out_of_zone', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='locationhistory',
+            index=models.Index(fields=['user', 'timestamp'], name='location_user_ts_idx'),
+        ),
+        migrations.AddField(
+            model_name='locationtrack',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_tracks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='locationtrack',
+            constraint=models.UniqueConstraint(fields=('user', 'bucket_start'), name='location_track_user_bucket_uniq'),
+        ),
+    ]
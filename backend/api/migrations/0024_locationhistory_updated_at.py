@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_timestamp(apps, schema_editor):
+    LocationHistory = apps.get_model('api', 'LocationHistory')
+    LocationHistory.objects.update(updated_at=models.F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_locationtrack_locationhistory_location_user_ts_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationhistory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_timestamp, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='locationhistory',
+            index=models.Index(fields=['user', 'updated_at'], name='location_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_locationhistory_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationhistory',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='locationhistory',
+            name='sample_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_availability(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    SafeZone = apps.get_model('api', 'SafeZone')
+    SupportRequest = apps.get_model('api', 'SupportRequest')
+    CaregiverAvailability = apps.get_model('api', 'CaregiverAvailability')
+
+    loads = dict(
+        SupportRequest.objects.filter(
+            assigned_caregiver__isnull=False, status__in=['Asignada', 'En curso']
+        ).values('assigned_caregiver').annotate(total=models.Count('id')).values_list('assigned_caregiver', 'total')
+    )
+    zones = {
+        user_id: (latitude, longitude)
+        for user_id, latitude, longitude in SafeZone.objects.values_list('user_id', 'latitude', 'longitude')
+    }
+    CaregiverAvailability.objects.bulk_create(
+        [
+            CaregiverAvailability(
+                caregiver_id=caregiver_id,
+                is_available=patient_id is None,
+                active_assignments=loads.get(caregiver_id, 0),
+                latitude=zones.get(patient_id, (None, None))[0],
+                longitude=zones.get(patient_id, (None, None))[1],
+            )
+            for caregiver_id, patient_id in User.objects.filter(user_type='Caregiver').values_list('id', 'patient_id')
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_locationhistory_ended_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaregiverAvailability',
+            fields=[
+                ('caregiver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='availability', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('is_available', models.BooleanField(default=True)),
+                ('active_assignments', models.PositiveIntegerField(default=0)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Caregiver availability',
+                'indexes': [models.Index(fields=['is_available', 'active_assignments'], name='caregiver_match_idx')],
+            },
+        ),
+        migrations.RunPython(build_availability, migrations.RunPython.noop),
+    ]
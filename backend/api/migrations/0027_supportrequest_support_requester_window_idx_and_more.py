@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_caregiveravailability'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supportrequest',
+            index=models.Index(fields=['requester', 'start_datetime', 'end_datetime'], name='support_requester_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supportrequest',
+            index=models.Index(fields=['assigned_caregiver', 'start_datetime', 'end_datetime'], name='support_caregiver_window_idx'),
+        ),
+    ]
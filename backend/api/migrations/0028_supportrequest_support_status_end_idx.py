@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_supportrequest_support_requester_window_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supportrequest',
+            index=models.Index(fields=['status', 'end_datetime'], name='support_status_end_idx'),
+        ),
+    ]
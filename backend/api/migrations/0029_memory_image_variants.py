@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_supportrequest_support_status_end_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def build_rollups(apps, schema_editor):
+    Activities = apps.get_model('api', 'Activities')
+    ActivityRollup = apps.get_model('api', 'ActivityRollup')
+    ActivitySummary = apps.get_model('api', 'ActivitySummary')
+
+    rollups = {}
+    summaries = {}
+    plays = Activities.objects.order_by('user_id', 'game', 'played_at').values_list(
+        'user_id', 'game', 'score', 'played_at'
+    )
+    for user_id, game, score, played_at in plays.iterator(chunk_size=5000):
+        day = timezone.localdate(played_at)
+        for period, start in (('day', day), ('week', day - timedelta(days=day.weekday()))):
+            rollup = rollups.get((user_id, game, period, start))
+            if rollup is None:
+                rollups[user_id, game, period, start] = ActivityRollup(
+                    user_id=user_id, game=game, period=period, period_start=start,
+                    plays=1, score_sum=score, score_min=score, score_max=score
+                )
+            else:
+                rollup.plays += 1
+                rollup.score_sum += score
+                rollup.score_min = min(rollup.score_min, score)
+                rollup.score_max = max(rollup.score_max, score)
+
+        summary = summaries.get((user_id, game))
+        if summary is None:
+            summaries[user_id, game] = ActivitySummary(
+                user_id=user_id, game=game, plays=1, score_sum=score, score_min=score,
+                score_max=score, last_score=score, first_played_at=played_at,
+                last_played_at=played_at, current_streak=1, longest_streak=1
+            )
+            continue
+        last_day = timezone.localdate(summary.last_played_at)
+        if day == last_day + timedelta(days=1):
+            summary.current_streak += 1
+        elif day > last_day:
+            summary.current_streak = 1
+        summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+        summary.plays += 1
+        summary.score_sum += score
+        summary.score_min = min(summary.score_min, score)
+        summary.score_max = max(summary.score_max, score)
+        summary.last_score = score
+        summary.last_played_at = played_at
+
+    ActivityRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+    ActivitySummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_media_blobs_and_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('memorice', 'Memorice'), ('puzzle', 'Puzzle'), ('sudoku', 'Sudoku'), ('camino', 'Camino Correcto')], max_length=20)),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('period_start', models.DateField()),
+                ('plays', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_min', models.IntegerField()),
+                ('score_max', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ActivitySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('memorice', 'Memorice'), ('puzzle', 'Puzzle'), ('sudoku', 'Sudoku'), ('camino', 'Camino Correcto')], max_length=20)),
+                ('plays', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_min', models.IntegerField()),
+                ('score_max', models.IntegerField()),
+                ('last_score', models.IntegerField()),
+                ('first_played_at', models.DateTimeField()),
+                ('last_played_at', models.DateTimeField()),
+                ('current_streak', models.PositiveIntegerField(default=1)),
+                ('longest_streak', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name_plural': 'Activity summaries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activities',
+            index=models.Index(fields=['user', 'game', 'played_at'], name='activity_user_game_idx'),
+        ),
+        migrations.AddField(
+            model_name='activityrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='activitysummary',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='activityrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'game', 'period', 'period_start'), name='activity_rollup_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='activitysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'game'), name='activity_summary_unique'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
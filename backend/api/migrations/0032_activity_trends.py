@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_activity_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(choices=[('memorice', 'Memorice'), ('puzzle', 'Puzzle'), ('sudoku', 'Sudoku'), ('camino', 'Camino Correcto')], max_length=20)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('mean_score', models.FloatField(blank=True, null=True)),
+                ('rolling_mean', models.FloatField(blank=True, null=True)),
+                ('slope_per_week', models.FloatField(blank=True, null=True)),
+                ('slope_t', models.FloatField(blank=True, null=True)),
+                ('change_point_on', models.DateField(blank=True, null=True)),
+                ('change_t', models.FloatField(blank=True, null=True)),
+                ('mean_before', models.FloatField(blank=True, null=True)),
+                ('mean_after', models.FloatField(blank=True, null=True)),
+                ('declining', models.BooleanField(default=False)),
+                ('series', models.JSONField(blank=True, default=list)),
+                ('dirty', models.BooleanField(default=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_trends', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dirty'], name='activity_trend_dirty_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'game'), name='activity_trend_unique')],
+            },
+        ),
+    ]
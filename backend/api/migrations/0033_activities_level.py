@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_activity_trends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activities',
+            name='level',
+            field=models.IntegerField(blank=True, help_text='Difficulty completed: 1=easy, 2=normal, 3=hard', null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def drop_duplicates(apps, schema_editor):
+    """Keep one row per (user, category, level), preferring the unlocked one"""
+    Achievement = apps.get_model('api', 'Achievement')
+    duplicated = Achievement.objects.values('user_id', 'category', 'level').annotate(
+        rows=Count('id')
+    ).filter(rows__gt=1)
+    for group in duplicated.iterator():
+        ids = list(Achievement.objects.filter(
+            user_id=group['user_id'], category=group['category'], level=group['level']
+        ).order_by('-unlocked', 'unlocked_at', 'created_at').values_list('id', flat=True))
+        Achievement.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_activities_level'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='achievement',
+            constraint=models.UniqueConstraint(fields=('user', 'category', 'level'), name='achievement_user_category_level_uniq'),
+        ),
+    ]
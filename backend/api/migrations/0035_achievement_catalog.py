@@ -0,0 +1,122 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Catalog as of this migration; later changes go through `manage.py create_achievements`
+SEED = [
+    ("memorice", 1, "Primer Recuerdo", "Completa Memorice en dificultad fácil"),
+    ("memorice", 2, "Memoria Rápida", "Completa Memorice en dificultad normal"),
+    ("memorice", 3, "Maestro del Recuerdo", "Completa Memorice en dificultad difícil"),
+    ("puzzle", 1, "Pieza en su Lugar", "Completa el Rompecabezas en dificultad fácil"),
+    ("puzzle", 2, "Construcción Perfecta", "Completa el Rompecabezas en dificultad normal"),
+    ("puzzle", 3, "Artesano del Puzzle", "Completa el Rompecabezas en dificultad difícil"),
+    ("sudoku", 1, "Primer Número", "Completa el Sudoku en dificultad fácil"),
+    ("sudoku", 2, "Mente Lógica", "Completa el Sudoku en dificultad normal"),
+    ("sudoku", 3, "Maestro del Sudoku", "Completa el Sudoku en dificultad difícil"),
+    ("camino", 1, "Primer Camino", "Completa Camino Correcto en dificultad fácil"),
+    ("camino", 2, "Sin Perderse", "Completa Camino Correcto en dificultad normal"),
+    ("camino", 3, "Explorador Total", "Completa Camino Correcto en dificultad difícil"),
+]
+
+
+def build_catalog(apps, schema_editor):
+    """Definitions from the seed plus any other (category, level) in use; unlocked rows become unlocks"""
+    Achievement = apps.get_model('api', 'Achievement')
+    AchievementDefinition = apps.get_model('api', 'AchievementDefinition')
+    AchievementUnlock = apps.get_model('api', 'AchievementUnlock')
+
+    catalog = {(category, level): (title, description) for category, level, title, description in SEED}
+    in_use = Achievement.objects.order_by('category', 'level', 'created_at').values_list(
+        'category', 'level', 'title', 'description'
+    )
+    for category, level, title, description in in_use.iterator(chunk_size=5000):
+        catalog.setdefault((category, level), (title, description))
+    AchievementDefinition.objects.bulk_create([
+        AchievementDefinition(category=category, level=level, title=title, description=description)
+        for (category, level), (title, description) in catalog.items()
+    ])
+
+    ids = {
+        (definition.category, definition.level): definition.pk
+        for definition in AchievementDefinition.objects.all()
+    }
+    unlocked = Achievement.objects.filter(unlocked=True).values_list(
+        'user_id', 'category', 'level', 'unlocked_at', 'created_at'
+    )
+    batch = []
+    for user_id, category, level, unlocked_at, created_at in unlocked.iterator(chunk_size=5000):
+        batch.append(AchievementUnlock(
+            user_id=user_id, definition_id=ids[category, level], unlocked_at=unlocked_at or created_at
+        ))
+        if len(batch) >= 5000:
+            AchievementUnlock.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    AchievementUnlock.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def restore_achievements(apps, schema_editor):
+    """One row per patient and definition, unlocked where an unlock exists"""
+    Achievement = apps.get_model('api', 'Achievement')
+    AchievementDefinition = apps.get_model('api', 'AchievementDefinition')
+    AchievementUnlock = apps.get_model('api', 'AchievementUnlock')
+    User = apps.get_model('api', 'User')
+
+    definitions = list(AchievementDefinition.objects.all())
+    unlocks = dict(
+        ((user_id, definition_id), unlocked_at)
+        for user_id, definition_id, unlocked_at in AchievementUnlock.objects.values_list(
+            'user_id', 'definition_id', 'unlocked_at'
+        ).iterator(chunk_size=5000)
+    )
+    for user_id in User.objects.filter(user_type='Patient').values_list('pk', flat=True).iterator(chunk_size=2000):
+        Achievement.objects.bulk_create([
+            Achievement(
+                user_id=user_id, category=definition.category, level=definition.level,
+                title=definition.title, description=definition.description,
+                unlocked=(user_id, definition.pk) in unlocks,
+                unlocked_at=unlocks.get((user_id, definition.pk)),
+            )
+            for definition in definitions
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_achievement_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AchievementDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('memorice', 'Memorice'), ('puzzle', 'Puzzle'), ('sudoku', 'Sudoku'), ('camino', 'Camino Correcto')], max_length=20)),
+                ('level', models.IntegerField(default=1, help_text='1=easy, 2=normal, 3=hard')),
+                ('title', models.CharField(max_length=60)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'level'), name='achievement_definition_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AchievementUnlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unlocked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('definition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unlocks', to='api.achievementdefinition')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='achievement_unlocks', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='achievementunlock',
+            constraint=models.UniqueConstraint(fields=('user', 'definition'), name='achievement_unlock_uniq'),
+        ),
+        migrations.RunPython(build_catalog, restore_achievements),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_achievement_catalog'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='Achievement',
+        ),
+    ]
@@ -4,4 +4,9 @@ from api.modules.medical_log.models import *
 from api.modules.memory.models import *
 from api.modules.safe_zone.models import *
 from api.modules.user.models import *
-from api.modules.support_request.models import *
\ No newline at end of file
+from api.modules.support_request.models import *
+from api.modules.notifications.models import *
+from api.modules.matching.models import *
+from api.modules.media.models import *
+from api.modules.activities.models import *
+from api.modules.achievements.models import *
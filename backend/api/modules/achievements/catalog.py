@@ -0,0 +1,95 @@
+"""
+The achievement catalog and its in-process cache.
+
+Definitions are few and change rarely, so every process keeps them in
+memory. Saving or deleting a definition bumps ``achievements:catalog_version``
+in the shared cache (signals in achievements/models.py); a process reloads
+its copy when it sees a new version, or after CATALOG_MAX_AGE seconds in
+case the version was evicted. Bulk ``update()`` calls on
+AchievementDefinition must call ``bump_catalog_version`` themselves.
+"""
+import threading
+import time
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from .models import ACHIEVEMENT_DEFINITIONS, AchievementDefinition
+
+
+CATALOG_MAX_AGE = 5 * 60
+VERSION_KEY = 'achievements:catalog_version'
+# Outlives CATALOG_MAX_AGE, so a lost version only delays a reload until then
+VERSION_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class Catalog(NamedTuple):
+    version: int
+    loaded_at: float
+    definitions: tuple
+    by_key: dict
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def bump_catalog_version():
+    cache.add(VERSION_KEY, 0, VERSION_CACHE_TIMEOUT)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Expired between add and incr
+        cache.set(VERSION_KEY, 1, VERSION_CACHE_TIMEOUT)
+
+
+def _load(version):
+    definitions = tuple(AchievementDefinition.objects.order_by('pk'))
+    return Catalog(
+        version=version,
+        loaded_at=time.monotonic(),
+        definitions=definitions,
+        by_key={(d.category, d.level): d for d in definitions},
+    )
+
+
+def get_catalog() -> Catalog:
+    global _catalog
+    version = cache.get(VERSION_KEY, 0)
+    catalog = _catalog
+    if catalog is None or catalog.version != version or time.monotonic() - catalog.loaded_at > CATALOG_MAX_AGE:
+        with _lock:
+            catalog = _catalog = _load(version)
+    return catalog
+
+
+def definitions():
+    """Every AchievementDefinition, in catalog order"""
+    return get_catalog().definitions
+
+
+def get_definition(category, level):
+    """The definition of (category, level), or None"""
+    return get_catalog().by_key.get((category, level))
+
+
+def sync_catalog(definitions=None):
+    """
+    Create or update the catalog from ACHIEVEMENT_DEFINITIONS
+
+    Definitions are matched on (category, level); titles and descriptions
+    are overwritten. Definitions missing from the seed are left alone.
+
+    Returns:
+        int: Definitions written
+    """
+    definitions = definitions or ACHIEVEMENT_DEFINITIONS
+    AchievementDefinition.objects.bulk_create(
+        [AchievementDefinition(**definition) for definition in definitions],
+        update_conflicts=True,
+        unique_fields=['category', 'level'],
+        update_fields=['title', 'description'],
+    )
+    # bulk_create sends no signals
+    bump_catalog_version()
+    return len(definitions)
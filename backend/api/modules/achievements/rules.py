@@ -0,0 +1,60 @@
+"""
+Server-side achievement rules.
+
+A play unlocks every catalog definition of its game whose rule it
+satisfies. Rules run in memory against the cached catalog, and the unlocks
+are written with one bulk insert that ignores existing rows. Evaluating a
+play therefore costs a constant number of queries however many rules match,
+and concurrent plays can't unlock the same achievement twice.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from .catalog import definitions
+from .models import AchievementUnlock
+
+
+def completed_at_level(level):
+    """The play was a completed game at ``level`` difficulty"""
+    return lambda activity: activity.level == level
+
+
+# Rules for specific (category, level) definitions; any other definition
+# is unlocked by completing its game at its level
+RULES: Dict[Tuple[str, int], Callable] = {}
+
+
+def rule_for(definition) -> Callable:
+    return RULES.get((definition.category, definition.level)) or completed_at_level(definition.level)
+
+
+def matching_definitions(activity) -> list:
+    return [
+        definition for definition in definitions()
+        if definition.category == activity.game and rule_for(definition)(activity)
+    ]
+
+
+def evaluate(activity) -> List[int]:
+    """
+    Unlock every achievement the play satisfies
+
+    Returns:
+        list: Levels newly unlocked in the play's category (already
+        unlocked ones are not included)
+    """
+    matching = matching_definitions(activity)
+    if not matching:
+        return []
+
+    unlocked = set(AchievementUnlock.objects.filter(
+        user_id=activity.user_id, definition__in=matching
+    ).values_list('definition_id', flat=True))
+    pending = [definition for definition in matching if definition.pk not in unlocked]
+    if not pending:
+        return []
+    # A concurrent evaluation that won the race makes this insert skip its rows
+    AchievementUnlock.objects.bulk_create(
+        [AchievementUnlock(user_id=activity.user_id, definition=definition) for definition in pending],
+        ignore_conflicts=True,
+    )
+    return [definition.level for definition in pending]
@@ -1,9 +1,17 @@
 from rest_framework import serializers
-from .models import Achievement
+from .models import AchievementDefinition
 
 class AchievementSerializer(serializers.ModelSerializer):
+    """
+    A catalog definition with the user's progress on it
+
+    Expects context['unlocks']: {definition id: unlocked_at} of the user.
+    """
+    unlocked = serializers.SerializerMethodField()
+    unlocked_at = serializers.SerializerMethodField()
+
     class Meta:
-        model = Achievement
+        model = AchievementDefinition
         fields = (
             'id',
             'category',
@@ -13,4 +21,11 @@ class AchievementSerializer(serializers.ModelSerializer):
             'unlocked',
             'unlocked_at'
         )
-        read_only_fields = ('id', 'created_at', 'user')
+        read_only_fields = fields
+
+    def get_unlocked(self, obj):
+        return obj.pk in self.context.get('unlocks', {})
+
+    def get_unlocked_at(self, obj):
+        unlocked_at = self.context.get('unlocks', {}).get(obj.pk)
+        return serializers.DateTimeField().to_representation(unlocked_at) if unlocked_at else None
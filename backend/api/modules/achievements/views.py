@@ -1,37 +1,56 @@
-from rest_framework import generics, status
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Achievement
+from .catalog import definitions, get_definition
+from .models import AchievementUnlock
 from .serializers import AchievementSerializer
+from ..user.models import User
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
+from django.http import Http404
 
-class AchievementListCreateView(generics.ListCreateAPIView):
-    """List all achievements for the authenticated user or create a new one"""
-    queryset = Achievement.objects.all()
-    serializer_class = AchievementSerializer
+
+def user_unlocks(user, **filters):
+    """{definition id: unlocked_at} of the user's unlocked achievements"""
+    return dict(AchievementUnlock.objects.filter(user=user, **filters).values_list('definition_id', 'unlocked_at'))
+
+
+class AchievementListView(APIView):
+    """List the achievement catalog with the authenticated user's progress"""
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        return Achievement.objects.filter(user=self.request.user)
-    
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+    def get(self, request):
+        if request.user.user_type != User.UserType.PATIENT:
+            # Only patients earn achievements
+            return Response([])
+        serializer = AchievementSerializer(
+            definitions(), many=True, context={'request': request, 'unlocks': user_unlocks(request.user)}
+        )
+        return Response(serializer.data)
 
-class AchievementRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update or delete a specific achievement"""
-    queryset = Achievement.objects.all()
-    serializer_class = AchievementSerializer
+class AchievementRetrieveView(APIView):
+    """Retrieve one achievement with the authenticated user's progress"""
     permission_classes = [IsAuthenticated]
-    
-    def get_queryset(self):
-        return Achievement.objects.filter(user=self.request.user)
+
+    def get(self, request, pk):
+        definition = next((d for d in definitions() if str(d.pk) == str(pk)), None)
+        if definition is None or request.user.user_type != User.UserType.PATIENT:
+            raise Http404("Achievement not found")
+        serializer = AchievementSerializer(
+            definition, context={'request': request, 'unlocks': user_unlocks(request.user, definition=definition)}
+        )
+        return Response(serializer.data)
 
 class UnlockAchievementView(APIView):
     """Unlock an achievement for the authenticated user"""
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
+        if request.user.user_type != User.UserType.PATIENT:
+            return Response(
+                {'error': 'Only patients can unlock achievements'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
         category = request.data.get('category')
         level = request.data.get('level')
         
@@ -42,29 +61,23 @@ class UnlockAchievementView(APIView):
             )
         
         try:
-            achievement = Achievement.objects.get(
-                user=request.user,
-                category=category,
-                level=level
-            )
-            
-            # Only unlock if not already unlocked
-            if not achievement.unlocked:
-                achievement.unlocked = True
-                achievement.unlocked_at = timezone.now()
-                achievement.save()
-                return Response(
-                    AchievementSerializer(achievement).data,
-                    status=status.HTTP_200_OK
-                )
-            else:
-                return Response(
-                    {'message': 'Achievement already unlocked'},
-                    status=status.HTTP_200_OK
-                )
-                
-        except Achievement.DoesNotExist:
+            definition = get_definition(category, int(level))
+        except (TypeError, ValueError):
+            definition = None
+        if definition is None:
             return Response(
                 {'error': 'Achievement not found'},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+        # The unique (user, definition) constraint makes concurrent unlocks create one row
+        unlock, created = AchievementUnlock.objects.get_or_create(user=request.user, definition=definition)
+        if not created:
+            return Response(
+                {'message': 'Achievement already unlocked'},
+                status=status.HTTP_200_OK
+            )
+        return Response(
+            AchievementSerializer(definition, context={'unlocks': {definition.pk: unlock.unlocked_at}}).data,
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,156 @@
+"""
+Trend statistics over a daily score series, in plain Python.
+
+Kept free of Django imports so worker processes can run it without setting
+up Django (see trends.compute_batch). Series hold at most one point per day,
+so numpy (not a dependency of the project) wouldn't pay for itself.
+"""
+import math
+
+
+ROLLING_DAYS = 7
+MIN_POINTS = 3
+MIN_SEGMENT = 5
+SLOPE_T = 2.0
+# The best of many splits is tested, so both a high t and a visible shift are required
+CHANGE_T = 4.0
+MIN_CHANGE_RATIO = 0.1
+
+
+def mean(values):
+    return sum(values) / len(values)
+
+
+def rolling_means(values, size=ROLLING_DAYS):
+    """Trailing mean of up to ``size`` values at each position"""
+    result = []
+    total = 0.0
+    for index, value in enumerate(values):
+        total += value
+        if index >= size:
+            total -= values[index - size]
+        result.append(total / min(index + 1, size))
+    return result
+
+
+def linear_fit(xs, ys):
+    """
+    Least-squares line through (xs, ys)
+
+    Returns:
+        tuple: (slope, intercept, t statistic of the slope; None if undefined)
+    """
+    count = len(xs)
+    mean_x, mean_y = mean(xs), mean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return 0.0, mean_y, None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    if count <= 2:
+        return slope, intercept, None
+    residual = sum((y - (intercept + slope * x)) ** 2 for x, y in zip(xs, ys))
+    standard_error = math.sqrt(residual / (count - 2) / sxx)
+    if standard_error == 0:
+        return slope, intercept, math.copysign(math.inf, slope) if slope else 0.0
+    return slope, intercept, slope / standard_error
+
+
+def change_point(ys, min_segment=MIN_SEGMENT):
+    """
+    Split maximizing Welch's t between the means before and after it
+
+    Uses prefix sums, so every split is evaluated in O(1).
+
+    Returns:
+        tuple: (index of the first point after the split, t, mean before,
+        mean after), or None if the series is too short
+    """
+    count = len(ys)
+    if count < 2 * min_segment:
+        return None
+    prefix = [0.0]
+    prefix_sq = [0.0]
+    for y in ys:
+        prefix.append(prefix[-1] + y)
+        prefix_sq.append(prefix_sq[-1] + y * y)
+
+    def stats(start, end):
+        size = end - start
+        total = prefix[end] - prefix[start]
+        average = total / size
+        variance = max((prefix_sq[end] - prefix_sq[start]) - size * average * average, 0.0) / (size - 1)
+        return size, average, variance
+
+    best = None
+    for split in range(min_segment, count - min_segment + 1):
+        size_a, mean_a, var_a = stats(0, split)
+        size_b, mean_b, var_b = stats(split, count)
+        spread = math.sqrt(var_a / size_a + var_b / size_b)
+        if spread == 0:
+            t = 0.0 if mean_a == mean_b else math.copysign(math.inf, mean_b - mean_a)
+        else:
+            t = (mean_b - mean_a) / spread
+        if best is None or abs(t) > abs(best[1]):
+            best = (split, t, mean_a, mean_b)
+    return best
+
+
+def analyze(days, means):
+    """
+    Trend of one (user, game) series; a pure function, safe to run in a worker process
+
+    Args:
+        days: dates with plays, ascending
+        means: mean score on each of those days
+
+    Returns:
+        dict: ActivityTrend field values
+    """
+    result = {
+        'points': len(days),
+        'mean_score': round(mean(means), 2) if means else None,
+        'rolling_mean': None,
+        'slope_per_week': None,
+        'slope_t': None,
+        'change_point_on': None,
+        'change_t': None,
+        'mean_before': None,
+        'mean_after': None,
+        'declining': False,
+        'series': [],
+    }
+    if not days:
+        return result
+
+    rolling = rolling_means(means)
+    result['rolling_mean'] = round(rolling[-1], 2)
+    result['series'] = [
+        {'day': day.isoformat(), 'mean': round(value, 2), 'rolling': round(average, 2)}
+        for day, value, average in zip(days, means, rolling)
+    ]
+    if len(days) < MIN_POINTS:
+        return result
+
+    xs = [(day - days[0]).days for day in days]
+    slope, _, slope_t = linear_fit(xs, means)
+    result['slope_per_week'] = round(slope * 7, 3)
+    result['slope_t'] = None if slope_t is None or math.isinf(slope_t) else round(slope_t, 2)
+    result['declining'] = slope < 0 and slope_t is not None and slope_t <= -SLOPE_T
+
+    split = change_point(means)
+    if split is not None and abs(split[1]) >= CHANGE_T \
+            and abs(split[3] - split[2]) >= MIN_CHANGE_RATIO * abs(split[2]):
+        index, t, before, after = split
+        result['change_point_on'] = days[index]
+        result['change_t'] = None if math.isinf(t) else round(t, 2)
+        result['mean_before'] = round(before, 2)
+        result['mean_after'] = round(after, 2)
+    return result
+
+
+def analyze_item(item):
+    """analyze() over a ((user_id, game), (days, means)) pair, for Executor.map"""
+    key, (days, means) = item
+    return key, analyze(days, means)
@@ -1,5 +1,7 @@
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from ..user.models import User  
 
 class Activities(models.Model):
@@ -15,7 +17,115 @@ class Activities(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activities")
     game = models.CharField(max_length=20, choices=ACTIVITY_GAMES)
     score = models.IntegerField()
+    level = models.IntegerField(null=True, blank=True, help_text="Difficulty completed: 1=easy, 2=normal, 3=hard")
     played_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'game', 'played_at'], name='activity_user_game_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.game} - {self.user.username} - {self.score}"
+
+
+class ActivityRollup(models.Model):
+    """Scores of one user and game over one day or week (see activities/stats.py)"""
+
+    class Period(models.TextChoices):
+        DAY = 'day'
+        WEEK = 'week'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activity_rollups")
+    game = models.CharField(max_length=20, choices=Activities.ACTIVITY_GAMES)
+    period = models.CharField(max_length=4, choices=Period.choices)
+    period_start = models.DateField()  # Monday for weeks
+    plays = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    score_min = models.IntegerField()
+    score_max = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game', 'period', 'period_start'], name='activity_rollup_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.game} - {self.user_id} - {self.period} {self.period_start}"
+
+
+class ActivitySummary(models.Model):
+    """All-time scores and daily streaks of one user and game"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activity_summaries")
+    game = models.CharField(max_length=20, choices=Activities.ACTIVITY_GAMES)
+    plays = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    score_min = models.IntegerField()
+    score_max = models.IntegerField()
+    last_score = models.IntegerField()
+    first_played_at = models.DateTimeField()
+    last_played_at = models.DateTimeField()
+    # Consecutive days with at least one play, ending on the day of last_played_at
+    current_streak = models.PositiveIntegerField(default=1)
+    longest_streak = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game'], name='activity_summary_unique'),
+        ]
+        verbose_name_plural = 'Activity summaries'
+
     def __str__(self):
-        return f"{self.game} - {self.user.username} - {self.score}"
\ No newline at end of file
+        return f"{self.game} - {self.user_id} ({self.plays})"
+
+
+class ActivityTrend(models.Model):
+    """Cached score trend of one user and game (see activities/trends.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activity_trends")
+    game = models.CharField(max_length=20, choices=Activities.ACTIVITY_GAMES)
+    points = models.PositiveIntegerField(default=0)  # Days played in the window
+    mean_score = models.FloatField(null=True, blank=True)
+    rolling_mean = models.FloatField(null=True, blank=True)
+    slope_per_week = models.FloatField(null=True, blank=True)
+    slope_t = models.FloatField(null=True, blank=True)
+    change_point_on = models.DateField(null=True, blank=True)
+    change_t = models.FloatField(null=True, blank=True)
+    mean_before = models.FloatField(null=True, blank=True)
+    mean_after = models.FloatField(null=True, blank=True)
+    declining = models.BooleanField(default=False)
+    series = models.JSONField(default=list, blank=True)
+    # Set by new plays; cleared when recomputed
+    dirty = models.BooleanField(default=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game'], name='activity_trend_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['dirty'], name='activity_trend_dirty_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.game} - {self.user_id} ({self.slope_per_week}/week)"
+
+
+@receiver(post_save, sender=Activities)
+def update_activity_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from .stats import rebuild_user, record_play
+    if created:
+        record_play(instance)
+    else:
+        # Edited scores can't be subtracted from min/max; recount this user
+        rebuild_user(instance.user_id)
+
+
+@receiver(post_delete, sender=Activities)
+def remove_activity_stats(sender, instance, origin=None, **kwargs):
+    # Plays deleted along with their user take the rollups with them
+    if isinstance(origin, User):
+        return
+    from .stats import rebuild_user
+    rebuild_user(instance.user_id)
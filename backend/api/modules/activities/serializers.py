@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Activities
+from .models import Activities, ActivityTrend
 
 class ActivitiesSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,6 +7,33 @@ class ActivitiesSerializer(serializers.ModelSerializer):
         fields = (
             'game',
             'score',
+            'level',
             'played_at'
         )
-        read_only_fields = ('Activities_id', 'game', 'played_at', 'played_at')
+        read_only_fields = ('played_at',)
+
+    def validate_level(self, value):
+        if value is not None and value not in (1, 2, 3):
+            raise serializers.ValidationError("level must be 1, 2 or 3.")
+        return value
+
+
+class ActivityTrendSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActivityTrend
+        fields = (
+            'game',
+            'points',
+            'mean_score',
+            'rolling_mean',
+            'slope_per_week',
+            'slope_t',
+            'declining',
+            'change_point_on',
+            'change_t',
+            'mean_before',
+            'mean_after',
+            'series',
+            'computed_at',
+        )
+        read_only_fields = fields
@@ -0,0 +1,201 @@
+"""
+Game statistics kept as rollups of Activities.
+
+Every new play adds itself to the day and week ActivityRollup rows and the
+ActivitySummary of its (user, game) with conditional UPDATEs, so reading
+statistics never touches the raw plays. Edits and deletes can't be undone
+incrementally (min/max), so they recount the affected user from scratch;
+rebuild() does the same for everyone in bulk.
+
+Days and weeks are calendar dates in TIME_ZONE; weeks start on Monday.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import Activities, ActivityRollup, ActivitySummary, ActivityTrend
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _add_to_rollup(activity, period, period_start):
+    lookup = dict(user_id=activity.user_id, game=activity.game, period=period, period_start=period_start)
+    score = activity.score
+    for _ in range(2):
+        updated = ActivityRollup.objects.filter(**lookup).update(
+            plays=F('plays') + 1,
+            score_sum=F('score_sum') + score,
+            score_min=Least('score_min', Value(score)),
+            score_max=Greatest('score_max', Value(score)),
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                ActivityRollup.objects.create(
+                    **lookup, plays=1, score_sum=score, score_min=score, score_max=score
+                )
+            return
+        except IntegrityError:
+            continue  # Created concurrently; add to that row instead
+
+
+def next_streak(current, last_day, day):
+    """Streak after a play on ``day`` when the previous play was on ``last_day``"""
+    if day == last_day:
+        return current
+    if day == last_day + timedelta(days=1):
+        return current + 1
+    if day > last_day:
+        return 1
+    return current  # Older than the last play; doesn't extend anything
+
+
+def _add_to_summary(activity, day):
+    # Runs inside record_play()'s transaction, which select_for_update needs
+    summary = ActivitySummary.objects.select_for_update().filter(
+        user_id=activity.user_id, game=activity.game
+    ).first()
+    if summary is None:
+        try:
+            with transaction.atomic():
+                ActivitySummary.objects.create(
+                    user_id=activity.user_id,
+                    game=activity.game,
+                    plays=1,
+                    score_sum=activity.score,
+                    score_min=activity.score,
+                    score_max=activity.score,
+                    last_score=activity.score,
+                    first_played_at=activity.played_at,
+                    last_played_at=activity.played_at,
+                )
+            return
+        except IntegrityError:
+            summary = ActivitySummary.objects.select_for_update().get(
+                user_id=activity.user_id, game=activity.game
+            )
+
+    last_day = timezone.localdate(summary.last_played_at)
+    summary.plays += 1
+    summary.score_sum += activity.score
+    summary.score_min = min(summary.score_min, activity.score)
+    summary.score_max = max(summary.score_max, activity.score)
+    summary.current_streak = next_streak(summary.current_streak, last_day, day)
+    summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+    summary.first_played_at = min(summary.first_played_at, activity.played_at)
+    if activity.played_at >= summary.last_played_at:
+        summary.last_played_at = activity.played_at
+        summary.last_score = activity.score
+    summary.save()
+
+
+def record_play(activity):
+    """Add a newly inserted play to its rollups and summary"""
+    day = timezone.localdate(activity.played_at)
+    with transaction.atomic():
+        _add_to_rollup(activity, ActivityRollup.Period.DAY, day)
+        _add_to_rollup(activity, ActivityRollup.Period.WEEK, week_start(day))
+        _add_to_summary(activity, day)
+        ActivityTrend.objects.filter(user_id=activity.user_id, game=activity.game, dirty=False).update(dirty=True)
+
+
+def streaks(days):
+    """(current, longest) for sorted distinct days; current ends on the last day"""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+
+def _build(activities):
+    """Rollup and summary rows for an Activities queryset, computed in SQL"""
+    tz = timezone.get_current_timezone()
+    rollups = []
+    for period, trunc in ((ActivityRollup.Period.DAY, TruncDate), (ActivityRollup.Period.WEEK, TruncWeek)):
+        grouped = activities.annotate(
+            period_start=trunc('played_at', tzinfo=tz)
+        ).order_by().values('user_id', 'game', 'period_start').annotate(
+            plays=Count('id'), score_sum=Sum('score'), score_min=Min('score'), score_max=Max('score')
+        )
+        for row in grouped.iterator(chunk_size=5000):
+            start = row['period_start']
+            rollups.append(ActivityRollup(
+                user_id=row['user_id'],
+                game=row['game'],
+                period=period,
+                period_start=start.date() if hasattr(start, 'date') else start,
+                plays=row['plays'],
+                score_sum=row['score_sum'],
+                score_min=row['score_min'],
+                score_max=row['score_max'],
+            ))
+
+    days = defaultdict(list)
+    for rollup in rollups:
+        if rollup.period == ActivityRollup.Period.DAY:
+            days[rollup.user_id, rollup.game].append(rollup.period_start)
+
+    totals = activities.order_by().values('user_id', 'game').annotate(
+        plays=Count('id'),
+        score_sum=Sum('score'),
+        score_min=Min('score'),
+        score_max=Max('score'),
+        first_played_at=Min('played_at'),
+        last_played_at=Max('played_at'),
+        last_score=Subquery(
+            Activities.objects.filter(user_id=OuterRef('user_id'), game=OuterRef('game'))
+            .order_by('-played_at').values('score')[:1]
+        ),
+    )
+    summaries = []
+    for row in totals.iterator(chunk_size=5000):
+        current, longest = streaks(sorted(days[row['user_id'], row['game']]))
+        summaries.append(ActivitySummary(
+            **row,
+            current_streak=current,
+            longest_streak=longest,
+        ))
+
+    return rollups, summaries
+
+
+def rebuild_user(user_id):
+    """Recount one user's statistics from their plays"""
+    rebuild([user_id])
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """
+    Recount statistics from scratch, for ``user_ids`` or everyone
+
+    Returns:
+        tuple: (rollups, summaries) written
+    """
+    activities = Activities.objects.all()
+    rollups = ActivityRollup.objects.all()
+    summaries = ActivitySummary.objects.all()
+    trends = ActivityTrend.objects.all()
+    if user_ids is not None:
+        activities = activities.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+        trends = trends.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        rollups.delete()
+        summaries.delete()
+        new_rollups, new_summaries = _build(activities)
+        ActivityRollup.objects.bulk_create(new_rollups, batch_size=batch_size)
+        ActivitySummary.objects.bulk_create(new_summaries, batch_size=batch_size)
+        trends.update(dirty=True)
+    return len(new_rollups), len(new_summaries)
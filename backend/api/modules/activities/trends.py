@@ -0,0 +1,150 @@
+"""
+Score trends per patient and game, for spotting cognitive decline.
+
+Input is the daily mean score over the last WINDOW_DAYS, read from the day
+rollups (one row per day played, not per play). For each (user, game):
+
+- rolling mean over the last ROLLING_DAYS days played
+- least-squares slope in points per week, with its t statistic
+- the single split of the series that best separates two means (change
+  point), flagged when both sides have MIN_SEGMENT days, Welch's t
+  exceeds CHANGE_T and the mean moved by MIN_CHANGE_RATIO
+
+A trend is "declining" when the slope is negative and significant
+(t <= -SLOPE_T). Results are cached in ActivityTrend. A cached trend is
+stale when new plays marked it dirty or when it was computed before today,
+since the window moves with the date even if the patient stops playing.
+Stale trends are recomputed on read or by `manage.py compute_activity_trends`,
+which spreads the math over a process pool.
+
+The statistics themselves live in analysis.py.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .analysis import analyze, analyze_item
+from .models import ActivityRollup, ActivityTrend
+
+
+WINDOW_DAYS = 90
+
+TREND_FIELDS = [
+    'points', 'mean_score', 'rolling_mean', 'slope_per_week', 'slope_t', 'change_point_on',
+    'change_t', 'mean_before', 'mean_after', 'declining', 'series',
+]
+
+
+def load_series(user_ids, games=None, today=None):
+    """
+    {(user_id, game): (days, means)} from the day rollups in the window
+
+    Returns:
+        dict: One entry per (user, game) with plays in the window
+    """
+    since = (today or timezone.localdate()) - timedelta(days=WINDOW_DAYS - 1)
+    rollups = ActivityRollup.objects.filter(
+        user_id__in=user_ids, period=ActivityRollup.Period.DAY, period_start__gte=since
+    )
+    if games:
+        rollups = rollups.filter(game__in=games)
+    series = {}
+    for user_id, game, day, plays, score_sum in rollups.order_by('user_id', 'game', 'period_start').values_list(
+        'user_id', 'game', 'period_start', 'plays', 'score_sum'
+    ).iterator(chunk_size=5000):
+        days, means = series.setdefault((user_id, game), ([], []))
+        days.append(day)
+        means.append(score_sum / plays)
+    return series
+
+
+def save_trends(results, computed_at=None):
+    """Upsert ActivityTrend rows from {(user_id, game): analyze() result}"""
+    computed_at = computed_at or timezone.now()
+    keys = list(results)
+    with transaction.atomic():
+        existing = {
+            (trend.user_id, trend.game): trend
+            for trend in ActivityTrend.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in keys}
+            )
+        }
+        created, updated = [], []
+        for key in keys:
+            trend = existing.get(key) or ActivityTrend(user_id=key[0], game=key[1])
+            for field, value in results[key].items():
+                setattr(trend, field, value)
+            trend.dirty = False
+            trend.computed_at = computed_at
+            (updated if trend.pk else created).append(trend)
+        ActivityTrend.objects.bulk_create(created, batch_size=500)
+        ActivityTrend.objects.bulk_update(updated, TREND_FIELDS + ['dirty', 'computed_at'], batch_size=500)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def is_stale(trend, today=None):
+    """New plays since it was computed, or computed over an earlier window"""
+    if trend.dirty or trend.computed_at is None:
+        return True
+    return timezone.localdate(trend.computed_at) < (today or timezone.localdate())
+
+
+def stale_filter(today=None):
+    """Q matching stale ActivityTrend rows, the counterpart of is_stale()"""
+    return (
+        Q(dirty=True)
+        | Q(computed_at__isnull=True)
+        | Q(computed_at__lt=start_of_day(today or timezone.localdate()))
+    )
+
+
+def trends_for(user_id, games):
+    """
+    Fresh trends of one user, recomputing only missing or dirty ones
+
+    Returns:
+        dict: {game: ActivityTrend}
+    """
+    trends = {trend.game: trend for trend in ActivityTrend.objects.filter(user_id=user_id, game__in=games)}
+    stale = [game for game in games if game not in trends or is_stale(trends[game])]
+    if stale:
+        series = load_series([user_id], stale)
+        save_trends({
+            (user_id, game): analyze(*series.get((user_id, game), ([], [])))
+            for game in stale
+        })
+        trends.update({
+            trend.game: trend
+            for trend in ActivityTrend.objects.filter(user_id=user_id, game__in=stale)
+        })
+    return trends
+
+
+def compute_batch(pairs, workers=None, executor=None):
+    """
+    Recompute the given (user_id, game) pairs, the math spread over a process pool
+
+    Data is loaded and saved in this process; workers only get the series.
+
+    Returns:
+        int: Number of trends written
+    """
+    if not pairs:
+        return 0
+    series = load_series({user_id for user_id, _ in pairs}, {game for _, game in pairs})
+    items = [(pair, series.get(pair, ([], []))) for pair in pairs]
+    if executor is not None:
+        results = dict(executor.map(analyze_item, items, chunksize=64))
+    elif workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = dict(pool.map(analyze_item, items, chunksize=64))
+    else:
+        results = dict(map(analyze_item, items))
+    save_trends(results)
+    return len(results)
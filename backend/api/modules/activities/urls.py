@@ -3,5 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.ActivitiesListCreateView.as_view(), name='activities-list'),
+    path('stats/', views.ActivityStatsView.as_view(), name='activities-stats'),
+    path('trends/', views.ActivityTrendsView.as_view(), name='activities-trends'),
     path('<pk>/', views.ActivitiesRetrieveUpdateDestroyView.as_view(), name='activities-detail'),
 ]
\ No newline at end of file
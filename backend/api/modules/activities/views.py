@@ -1,7 +1,19 @@
-from rest_framework import generics
-from .models import Activities
-from .serializers import ActivitiesSerializer
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from .models import Activities, ActivityRollup, ActivitySummary
+from .serializers import ActivitiesSerializer, ActivityTrendSerializer
+from .stats import week_start
+from .trends import trends_for
 from rest_framework.permissions import IsAuthenticated
+from ..user.relationships import get_resolver
+
+MAX_LIST_LIMIT = 500
+DEFAULT_STATS_PERIODS = 30
+MAX_STATS_PERIODS = 366
 
 class ActivitiesListCreateView(generics.ListCreateAPIView):
     queryset = Activities.objects.all()
@@ -9,10 +21,31 @@ class ActivitiesListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Activities.objects.filter(user=self.request.user)
+        # Newest first; ?game= filters, ?limit= keeps only the latest plays
+        queryset = Activities.objects.filter(user=self.request.user).order_by('-played_at')
+        game = self.request.query_params.get('game')
+        if game:
+            queryset = queryset.filter(game=game)
+        limit = self.request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = min(max(int(limit), 1), MAX_LIST_LIMIT)
+            except ValueError:
+                limit = MAX_LIST_LIMIT
+            queryset = queryset[:limit]
+        return queryset
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        self.activity = serializer.save(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        # Set by the achievement rules evaluated when the play was saved
+        response.data['unlocked_achievements'] = [
+            {'category': self.activity.game, 'level': level}
+            for level in getattr(self.activity, 'unlocked_levels', [])
+        ]
+        return response
 
 class ActivitiesRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Activities.objects.all()
@@ -20,4 +53,113 @@ class ActivitiesRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView)
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Activities.objects.filter(user=self.request.user)
\ No newline at end of file
+        return Activities.objects.filter(user=self.request.user)
+
+class ActivityStatsView(APIView):
+    """
+    Per-game statistics of the patient (the user, or the caregiver's patient)
+
+    Served from the rollups in activities/stats.py: one query for the
+    all-time summaries and one for the ?period=day|week series covering the
+    last ?periods= periods, optionally for one ?game=.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        patient_id = get_resolver(request).patient_id
+        if patient_id is None:
+            return Response(
+                {'error': 'No patient associated with this account'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        period = request.query_params.get('period', ActivityRollup.Period.DAY)
+        if period not in ActivityRollup.Period.values:
+            return Response(
+                {'error': 'period must be one of: ' + ', '.join(ActivityRollup.Period.values)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            periods = min(max(int(request.query_params.get('periods', DEFAULT_STATS_PERIODS)), 1), MAX_STATS_PERIODS)
+        except ValueError:
+            return Response({'error': 'periods must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        if period == ActivityRollup.Period.DAY:
+            since = today - timedelta(days=periods - 1)
+        else:
+            since = week_start(today) - timedelta(weeks=periods - 1)
+
+        summaries = ActivitySummary.objects.filter(user_id=patient_id)
+        rollups = ActivityRollup.objects.filter(
+            user_id=patient_id, period=period, period_start__gte=since
+        ).order_by('period_start')
+        game = request.query_params.get('game')
+        if game:
+            summaries = summaries.filter(game=game)
+            rollups = rollups.filter(game=game)
+
+        series = {}
+        for rollup in rollups:
+            series.setdefault(rollup.game, []).append({
+                'period_start': rollup.period_start,
+                'plays': rollup.plays,
+                'min_score': rollup.score_min,
+                'max_score': rollup.score_max,
+                'mean_score': round(rollup.score_sum / rollup.plays, 2),
+            })
+
+        games = []
+        for summary in summaries.order_by('game'):
+            last_day = timezone.localdate(summary.last_played_at)
+            games.append({
+                'game': summary.game,
+                'plays': summary.plays,
+                'best_score': summary.score_max,
+                'worst_score': summary.score_min,
+                'mean_score': round(summary.score_sum / summary.plays, 2),
+                'last_score': summary.last_score,
+                'first_played_at': summary.first_played_at,
+                'last_played_at': summary.last_played_at,
+                # A streak is still alive until a full day passes without playing
+                'current_streak': summary.current_streak if last_day >= today - timedelta(days=1) else 0,
+                'longest_streak': summary.longest_streak,
+                'series': series.get(summary.game, []),
+            })
+
+        return Response({
+            'patient_id': patient_id,
+            'period': period,
+            'since': since,
+            'games': games,
+        }, status=status.HTTP_200_OK)
+
+class ActivityTrendsView(APIView):
+    """
+    Score trends of the patient per game (see activities/trends.py)
+
+    Cached trends are served as-is; games with new plays since they were
+    computed are recomputed first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        patient_id = get_resolver(request).patient_id
+        if patient_id is None:
+            return Response(
+                {'error': 'No patient associated with this account'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        games = list(ActivitySummary.objects.filter(user_id=patient_id).values_list('game', flat=True))
+        game = request.query_params.get('game')
+        if game:
+            games = [name for name in games if name == game]
+
+        trends = trends_for(patient_id, games)
+        return Response({
+            'patient_id': patient_id,
+            'trends': ActivityTrendSerializer(
+                [trends[name] for name in sorted(trends)], many=True
+            ).data,
+        }, status=status.HTTP_200_OK)
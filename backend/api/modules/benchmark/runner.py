@@ -0,0 +1,148 @@
+"""
+Drive the hot API paths through the Django test client.
+
+Requests go through the full middleware stack with real JWT headers. Each
+scenario runs sequentially from a single client; latency percentiles are
+exact (nearest rank over every sample) and throughput is requests per
+second of wall time spent in that scenario.
+"""
+import math
+import random
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.modules.safe_zone.models import SafeZone
+from api.modules.user.models import User
+
+from .seed import USERNAME_PREFIX
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of sorted ``samples``"""
+    if not samples:
+        return None
+    return samples[max(math.ceil(q * len(samples)) - 1, 0)]
+
+
+def summarize(latencies, queries, statuses, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': sum(1 for code in statuses if code >= 400),
+        'throughput_rps': round(count / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / count, 3) if count else None,
+            'p50': round(percentile(latencies, 0.50), 3) if count else None,
+            'p95': round(percentile(latencies, 0.95), 3) if count else None,
+            'p99': round(percentile(latencies, 0.99), 3) if count else None,
+            'max': round(latencies[-1], 3) if count else None,
+        },
+        'queries': {
+            'mean': round(sum(queries) / count, 2) if count else None,
+            'max': max(queries) if count else None,
+        },
+    }
+
+
+class Actor:
+    """A benchmark user with its own access token and rotating refresh token"""
+
+    def __init__(self, user):
+        self.user = user
+        self.refresh = str(RefreshToken.for_user(user))
+        self._headers = None
+        self._issued_at = 0.0
+
+    @property
+    def headers(self):
+        # Re-issued halfway through the access token lifetime so long runs keep authenticating
+        if time.monotonic() - self._issued_at > jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds() / 2:
+            header_type = jwt_settings.AUTH_HEADER_TYPES[0]
+            self._headers = {'HTTP_AUTHORIZATION': f'{header_type} {AccessToken.for_user(self.user)}'}
+            self._issued_at = time.monotonic()
+        return self._headers
+
+
+class BenchmarkRunner:
+    def __init__(self, users=50, rng=None):
+        self.rng = rng or random.Random(0)
+        self.client = Client()
+
+        caregivers = list(
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX, user_type=User.UserType.CAREGIVER
+            ).select_related('patient').order_by('id')[:users]
+        )
+        self.caregivers = [Actor(caregiver) for caregiver in caregivers]
+        self.patients = [Actor(caregiver.patient) for caregiver in caregivers if caregiver.patient]
+        self.zones = {
+            zone.user_id: (float(zone.latitude), float(zone.longitude))
+            for zone in SafeZone.objects.filter(user__in=[actor.user for actor in self.patients])
+        }
+
+    def scenarios(self):
+        """name -> callable issuing one request and returning the response"""
+        return {
+            'location_update': self.location_update,
+            'location_history': self.location_history,
+            'cards': self.cards,
+            'support_requests': self.support_requests,
+            'jwt_refresh': self.jwt_refresh,
+        }
+
+    def location_update(self):
+        actor = self.rng.choice(self.patients)
+        latitude, longitude = self.zones.get(actor.user.id, (0.0, 0.0))
+        return self.client.post(
+            '/api/safe-zone/location/update/',
+            {
+                'latitude': f'{latitude + self.rng.uniform(-0.003, 0.003):.6f}',
+                'longitude': f'{longitude + self.rng.uniform(-0.003, 0.003):.6f}',
+            },
+            content_type='application/json',
+            **actor.headers
+        )
+
+    def location_history(self):
+        actor = self.rng.choice(self.caregivers)
+        return self.client.get('/api/safe-zone/location/history/', **actor.headers)
+
+    def cards(self):
+        actor = self.rng.choice(self.caregivers)
+        return self.client.get('/api/card/', **actor.headers)
+
+    def support_requests(self):
+        actor = self.rng.choice(self.caregivers)
+        return self.client.get('/api/support-requests/', **actor.headers)
+
+    def jwt_refresh(self):
+        # Rotation blacklists the old token, so each actor keeps the newest one
+        actor = self.rng.choice(self.caregivers)
+        response = self.client.post(
+            '/auth/jwt/refresh/', {'refresh': actor.refresh}, content_type='application/json'
+        )
+        if response.status_code == 200:
+            actor.refresh = response.json().get('refresh', actor.refresh)
+        return response
+
+    def run(self, name, requests, warmup=0):
+        issue = self.scenarios()[name]
+        for _ in range(warmup):
+            issue()
+
+        latencies, queries, statuses = [], [], []
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                begin = time.perf_counter()
+                response = issue()
+                latencies.append((time.perf_counter() - begin) * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses.append(response.status_code)
+        return summarize(latencies, queries, statuses, time.perf_counter() - started)
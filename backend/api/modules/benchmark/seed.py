@@ -0,0 +1,168 @@
+"""
+Synthetic data for the API benchmark.
+
+Every patient gets one main caregiver, a safe zone, a location history
+(random walk around the zone, one point every POINT_INTERVAL_SECONDS),
+cards written by the caregiver and support requests between neighbouring
+caregivers. Rows are generated in chunks and bulk inserted, so millions of
+points do not have to fit in memory.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from api.modules.card.models import Card
+from api.modules.safe_zone.models import LocationHistory, SafeZone
+from api.modules.support_request.models import SupportRequest
+from api.modules.user.models import User
+
+
+USERNAME_PREFIX = 'bench_'
+PASSWORD = 'benchmark'
+BATCH_SIZE = 5000
+POINT_INTERVAL_SECONDS = 30
+
+# Santiago; points wander a few hundred meters around each home
+BASE_LATITUDE = -33.45
+BASE_LONGITUDE = -70.66
+
+
+def is_seeded():
+    return User.objects.filter(username__startswith=USERNAME_PREFIX).exists()
+
+
+def _coordinate(value):
+    return Decimal(f'{value:.6f}')
+
+
+def seed(patients, points_per_patient, cards_per_patient, requests_per_caregiver, rng=None, log=print):
+    """
+    Insert the benchmark population
+
+    Returns:
+        dict: Row counts per model
+    """
+    rng = rng or random.Random(0)
+    password = make_password(PASSWORD)  # Hashed once; create_user would hash per user
+    now = timezone.now()
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f'{USERNAME_PREFIX}patient_{i}',
+                    email=f'{USERNAME_PREFIX}patient_{i}@benchmark.local',
+                    password=password,
+                    user_type=User.UserType.PATIENT,
+                )
+                for i in range(patients)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        patient_ids = list(
+            User.objects.filter(username__startswith=f'{USERNAME_PREFIX}patient_')
+            .order_by('id').values_list('id', flat=True)
+        )
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f'{USERNAME_PREFIX}caregiver_{i}',
+                    email=f'{USERNAME_PREFIX}caregiver_{i}@benchmark.local',
+                    password=password,
+                    user_type=User.UserType.CAREGIVER,
+                    patient_id=patient_id,
+                )
+                for i, patient_id in enumerate(patient_ids)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        caregiver_ids = list(
+            User.objects.filter(username__startswith=f'{USERNAME_PREFIX}caregiver_')
+            .order_by('patient_id').values_list('id', flat=True)
+        )
+
+        homes = {
+            patient_id: (BASE_LATITUDE + rng.uniform(-0.2, 0.2), BASE_LONGITUDE + rng.uniform(-0.2, 0.2))
+            for patient_id in patient_ids
+        }
+        SafeZone.objects.bulk_create(
+            [
+                SafeZone(
+                    user_id=patient_id,
+                    latitude=_coordinate(latitude),
+                    longitude=_coordinate(longitude),
+                    radius_meters=200,
+                )
+                for patient_id, (latitude, longitude) in homes.items()
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        Card.objects.bulk_create(
+            [
+                Card(
+                    user_id=patient_id,
+                    created_by_user_id=caregiver_id,
+                    card_type=rng.choice(Card.CardType.values),
+                    message=f'Recordatorio {n}',
+                )
+                for patient_id, caregiver_id in zip(patient_ids, caregiver_ids)
+                for n in range(cards_per_patient)
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        support_requests = []
+        for i, caregiver_id in enumerate(caregiver_ids):
+            helper_id = caregiver_ids[(i + 1) % len(caregiver_ids)]
+            for n in range(requests_per_caregiver):
+                start = now + timedelta(days=rng.randint(-30, 30), hours=rng.randint(0, 23))
+                support_requests.append(SupportRequest(
+                    requester_id=caregiver_id,
+                    assigned_caregiver_id=helper_id if n % 2 else None,
+                    patient_id=patient_ids[i],
+                    reason=f'Apoyo {n}',
+                    start_datetime=start,
+                    end_datetime=start + timedelta(hours=4),
+                    status=SupportRequest.Status.ASIGNADA if n % 2 else SupportRequest.Status.EN_ESPERA,
+                ))
+        SupportRequest.objects.bulk_create(support_requests, batch_size=BATCH_SIZE)
+
+    log(f'  {len(patient_ids)} patients, {len(caregiver_ids)} caregivers, '
+        f'{len(patient_ids) * cards_per_patient} cards, {len(support_requests)} support requests')
+
+    total_points = 0
+    start = now - timedelta(seconds=points_per_patient * POINT_INTERVAL_SECONDS)
+    chunk = []
+    for index, patient_id in enumerate(patient_ids, start=1):
+        latitude, longitude = homes[patient_id]
+        for n in range(points_per_patient):
+            latitude += rng.gauss(0, 0.0002)
+            longitude += rng.gauss(0, 0.0002)
+            chunk.append(LocationHistory(
+                user_id=patient_id,
+                latitude=_coordinate(latitude),
+                longitude=_coordinate(longitude),
+                timestamp=start + timedelta(seconds=n * POINT_INTERVAL_SECONDS),
+            ))
+            if len(chunk) >= BATCH_SIZE:
+                LocationHistory.objects.bulk_create(chunk)
+                total_points += len(chunk)
+                chunk = []
+        if index % 100 == 0:
+            log(f'  [{index}/{len(patient_ids)}] {total_points + len(chunk)} location points')
+    if chunk:
+        LocationHistory.objects.bulk_create(chunk)
+        total_points += len(chunk)
+
+    return {
+        'patients': len(patient_ids),
+        'caregivers': len(caregiver_ids),
+        'cards': len(patient_ids) * cards_per_patient,
+        'support_requests': len(support_requests),
+        'location_points': total_points,
+    }
@@ -4,6 +4,7 @@ from .models import Card
 from .serializers import CardSerializer
 from rest_framework.permissions import IsAuthenticated
 from .models import User
+from ..user.relationships import get_resolver
 
 class CardListCreateView(generics.ListCreateAPIView):
     queryset = Card.objects.all()
@@ -11,15 +12,9 @@ class CardListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        
-        if user.user_type == User.UserType.PATIENT:
-            return Card.objects.filter(user=user)
-        
-        if user.user_type == User.UserType.CAREGIVER and user.patient:
-            return Card.objects.filter(user=user.patient)
-        
-        return Card.objects.filter(user=user)
+        # Patients see their own cards, caregivers their patient's (or their own without one)
+        owner_id = get_resolver(self.request).patient_id or self.request.user.id
+        return Card.objects.filter(user_id=owner_id).select_related('created_by_user')
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -29,7 +24,7 @@ class CardListCreateView(generics.ListCreateAPIView):
             return
 
         if user.user_type == User.UserType.CAREGIVER:
-            serializer.save(user=user.patient, created_by_user=user)
+            serializer.save(user_id=user.patient_id, created_by_user=user)
             return
 
         serializer.save(user=user, created_by_user=user)
@@ -41,15 +36,9 @@ class CardRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        
-        if user.user_type == User.UserType.PATIENT:
-            return Card.objects.filter(user=user)
-        
-        if user.user_type == User.UserType.CAREGIVER and user.patient:
-            return Card.objects.filter(user=user.patient)
-        
-        return Card.objects.filter(user=user)
+        # Patients see their own cards, caregivers their patient's (or their own without one)
+        owner_id = get_resolver(self.request).patient_id or self.request.user.id
+        return Card.objects.filter(user_id=owner_id).select_related('created_by_user')
     
     def perform_destroy(self, instance):
         user = self.request.user
@@ -0,0 +1,51 @@
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from ..user.models import User
+from ..support_request.models import SupportRequest
+
+
+class CaregiverAvailability(models.Model):
+    """
+    Matching index: one row per caregiver, kept in sync by the signals below.
+
+    Coordinates are those of the safe zone of the caregiver's current or
+    last patient, and are kept after the patient is unassigned so free
+    caregivers can still be ranked by proximity.
+    """
+    caregiver = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='availability'
+    )
+    is_available = models.BooleanField(default=True)  # No patient assigned
+    active_assignments = models.PositiveIntegerField(default=0)  # Support requests Asignada / En curso
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_available', 'active_assignments'], name='caregiver_match_idx'),
+        ]
+        verbose_name_plural = 'Caregiver availability'
+
+    def __str__(self):
+        return f"{self.caregiver_id} ({'disponible' if self.is_available else 'ocupado'}, {self.active_assignments})"
+
+
+@receiver(post_save, sender=User)
+def sync_caregiver_availability(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or instance.user_type != User.UserType.CAREGIVER:
+        return
+    if not created and update_fields is not None and 'patient' not in update_fields:
+        return
+    from .services import sync_caregiver
+    sync_caregiver(instance)
+
+
+@receiver(post_save, sender=SupportRequest)
+def sync_assigned_caregiver_load(sender, instance, raw=False, **kwargs):
+    if raw or instance.assigned_caregiver_id is None:
+        return
+    from .services import refresh_load
+    refresh_load([instance.assigned_caregiver_id])
@@ -0,0 +1,158 @@
+"""
+Caregiver matching for support requests.
+
+Candidates come from the CaregiverAvailability index (free caregivers,
+least loaded first) and are ranked by (load, distance to the patient's
+safe zone). Assignment locks the support request and then the caregiver's
+availability row, always in that order, so two requests can never claim
+the same caregiver and concurrent claims do not deadlock.
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from rest_framework import status
+
+from ..safe_zone.geofence import haversine_meters
+from ..safe_zone.models import SafeZone
+from ..support_request.models import SupportRequest
+from ..support_request.scheduling import BUSY_STATUSES, busy_caregiver_ids, caregiver_conflicts
+from ..user.models import User
+from .models import CaregiverAvailability
+
+
+DEFAULT_CANDIDATES = 50
+
+
+class AssignmentError(Exception):
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def zone_coordinates(patient_id) -> Optional[Tuple[float, float]]:
+    if patient_id is None:
+        return None
+    zone = SafeZone.objects.filter(user_id=patient_id).values_list('latitude', 'longitude').first()
+    return (float(zone[0]), float(zone[1])) if zone else None
+
+
+def active_load(caregiver_id) -> int:
+    return SupportRequest.objects.filter(
+        assigned_caregiver_id=caregiver_id, status__in=BUSY_STATUSES
+    ).count()
+
+
+def sync_caregiver(caregiver: User):
+    """Rebuild the caregiver's availability row from the source tables"""
+    values = {
+        'is_available': caregiver.patient_id is None,
+        'active_assignments': active_load(caregiver.pk),
+    }
+    coordinates = zone_coordinates(caregiver.patient_id)
+    if coordinates is not None:
+        values['latitude'], values['longitude'] = coordinates
+    CaregiverAvailability.objects.update_or_create(caregiver_id=caregiver.pk, defaults=values)
+
+
+def refresh_load(caregiver_ids):
+    for caregiver_id in caregiver_ids:
+        CaregiverAvailability.objects.filter(caregiver_id=caregiver_id).update(
+            active_assignments=active_load(caregiver_id)
+        )
+
+
+def rank_candidates(
+    target: Optional[Tuple[float, float]],
+    exclude_ids=(),
+    limit=DEFAULT_CANDIDATES,
+    window: Optional[Tuple[datetime, datetime]] = None
+) -> List[User]:
+    """
+    Free caregivers, least loaded first and nearest to ``target`` within a load
+
+    With ``window`` = (start, end), caregivers with an assignment overlapping
+    it are left out.
+
+    Only rows whose load is at most that of the ``limit``-th least loaded
+    caregiver can make the cut, so those are the only ones fetched.
+    """
+    available = CaregiverAvailability.objects.filter(is_available=True).exclude(caregiver_id__in=exclude_ids)
+    if window is not None:
+        available = available.exclude(caregiver_id__in=busy_caregiver_ids(*window))
+    threshold = available.order_by('active_assignments').values_list(
+        'active_assignments', flat=True
+    )[limit - 1:limit].first()
+    if threshold is not None:
+        available = available.filter(active_assignments__lte=threshold)
+
+    rows = list(available.select_related('caregiver'))
+    if target is not None:
+        located = [row for row in rows if row.latitude is not None]
+        distances = dict(zip(
+            (row.pk for row in located),
+            haversine_meters(target[0], target[1], [(float(row.latitude), float(row.longitude)) for row in located])
+        ))
+    else:
+        distances = {}
+
+    rows.sort(key=lambda row: (row.active_assignments, distances.get(row.pk, float('inf')), row.pk))
+    caregivers = []
+    for row in rows[:limit]:
+        caregiver = row.caregiver
+        caregiver.active_assignments = row.active_assignments
+        caregiver.distance_meters = round(distances[row.pk]) if row.pk in distances else None
+        caregivers.append(caregiver)
+    return caregivers
+
+
+def assign_caregiver(support_request_id, caregiver_id, acting_user) -> SupportRequest:
+    """
+    Claim ``caregiver_id`` for a waiting support request, atomically
+
+    Raises:
+        AssignmentError: with the message and HTTP status to return
+    """
+    with transaction.atomic():
+        support_request = SupportRequest.objects.select_for_update().filter(pk=support_request_id).first()
+        if support_request is None:
+            raise AssignmentError('Solicitud no encontrada.', status.HTTP_404_NOT_FOUND)
+
+        # Only requester can assign others, anyone can assign themselves
+        if caregiver_id != acting_user.id and support_request.requester_id != acting_user.id:
+            raise AssignmentError('Solo el solicitante puede asignar a otro cuidador.', status.HTTP_403_FORBIDDEN)
+
+        if support_request.status != SupportRequest.Status.EN_ESPERA or support_request.assigned_caregiver_id:
+            raise AssignmentError('Esta solicitud ya fue tomada por otro cuidador.', status.HTTP_409_CONFLICT)
+
+        availability = CaregiverAvailability.objects.select_for_update().filter(caregiver_id=caregiver_id).first()
+        caregiver = User.objects.filter(id=caregiver_id, user_type=User.UserType.CAREGIVER).first()
+        if caregiver is None:
+            raise AssignmentError('Cuidador no encontrado.', status.HTTP_404_NOT_FOUND)
+
+        # The locked index row is authoritative; fall back to the user row if it is missing
+        is_available = availability.is_available if availability else caregiver.patient_id is None
+        if not is_available or caregiver.patient_id is not None:
+            raise AssignmentError('Este cuidador ya tiene un paciente asignado.')
+
+        if caregiver_conflicts(
+            caregiver.pk, support_request.start_datetime, support_request.end_datetime, support_request.pk
+        ).exists():
+            raise AssignmentError('Este cuidador ya tiene un apoyo en ese horario.', status.HTTP_409_CONFLICT)
+
+        requester = User.objects.get(pk=support_request.requester_id)
+        requester_patient_id = requester.patient_id
+        if requester_patient_id:
+            # Save patient reference and temporarily assign the patient to the caregiver
+            support_request.patient_id = requester_patient_id
+            caregiver.patient_id = requester_patient_id
+            caregiver.save()
+        else:
+            print(f"⚠️ Requester {requester.username} has no patient assigned")
+
+        support_request.assigned_caregiver = caregiver
+        support_request.requester = requester
+        support_request.status = SupportRequest.Status.ASIGNADA
+        support_request.save()  # The post_save signal refreshes the caregiver's load
+    return support_request
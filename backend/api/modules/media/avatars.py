@@ -0,0 +1,81 @@
+"""
+Profile pictures, normalized on upload.
+
+An upload is cropped to a square and re-encoded at each size in
+AVATAR_SIZES; every size is a content-addressed blob, so re-uploading the
+same photo (or two users uploading it) stores nothing new.
+``User.profile_picture`` points at the largest size and
+``User.profile_picture_variants`` holds all of them.
+"""
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from . import blobs
+from .processing import CONTENT_TYPE, encode, open_upright, to_webp
+
+
+DEFAULT_SIZES = {
+    # name: side in pixels
+    'large': 512,
+    'small': 128,
+}
+
+
+def get_avatar_sizes():
+    return getattr(settings, 'AVATAR_SIZES', DEFAULT_SIZES)
+
+
+def store_avatar(upload) -> dict:
+    """
+    Normalize an uploaded image and acquire a blob per size
+
+    Returns:
+        dict: {size name: blob name}
+
+    Raises:
+        One of processing.DECODE_ERRORS if the upload can't be decoded
+    """
+    image = open_upright(upload)
+    variants = {}
+    for name, side in get_avatar_sizes().items():
+        content = to_webp(encode(image, side, square=True))
+        variants[name] = blobs.acquire(content, CONTENT_TYPE, width=side, height=side)
+    return variants
+
+
+def main_variant(variants: dict) -> str:
+    """The largest size, stored in User.profile_picture"""
+    sizes = get_avatar_sizes()
+    return variants[max(variants, key=lambda name: sizes.get(name, 0))]
+
+
+def avatar_names(user) -> list:
+    """The blob references held by the user's picture, one per acquire()"""
+    if user.profile_picture_variants:
+        return list(user.profile_picture_variants.values())
+    return [user.profile_picture.name] if user.profile_picture else []
+
+
+def discard_avatar(*names) -> None:
+    """
+    Let go of a replaced or deleted picture
+
+    Blobs lose a reference and are collected once unreferenced; legacy
+    uploads that were never normalized belong to one user and are deleted.
+    """
+    blobs.release(*names)
+    for name in names:
+        if not blobs.is_blob(name):
+            try:
+                default_storage.delete(name)
+            except OSError as e:
+                print(f"❌ Could not delete profile picture {name}: {str(e)}")
+
+
+def avatar_urls(user, request=None) -> dict:
+    """{size name: URL}; absolute when a request is available, like ImageField"""
+    urls = {}
+    for name, path in (user.profile_picture_variants or {}).items():
+        url = default_storage.url(path)
+        urls[name] = request.build_absolute_uri(url) if request is not None else url
+    return urls
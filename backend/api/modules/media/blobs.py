@@ -0,0 +1,128 @@
+"""
+Content-addressed file storage with reference counting.
+
+Files are written once under ``blobs/<aa>/<sha256>.<ext>``, so identical
+content is stored once and a name never changes meaning, which lets it be
+served as immutable. Owners call acquire() for every blob they point to and
+release() when they stop; nothing is deleted in the request. Blobs that stay
+unreferenced for a grace period are removed by collect_unreferenced().
+"""
+import hashlib
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MediaBlob
+
+
+BLOB_PREFIX = 'blobs/'
+GC_GRACE_SECONDS = 60 * 60
+
+EXTENSIONS = {
+    'image/webp': 'webp',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+}
+
+
+def blob_name(digest, content_type):
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest}.{EXTENSIONS.get(content_type, 'bin')}"
+
+
+def is_blob(name) -> bool:
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def _write(name, content: bytes):
+    # Same name means same bytes, so an existing file is already correct
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(content))
+        if saved != name:
+            # Lost a race with a concurrent writer of the same content
+            default_storage.delete(saved)
+
+
+def acquire(content: bytes, content_type: str, width=None, height=None) -> str:
+    """
+    Store ``content`` (if new) and take a reference to it
+
+    Returns:
+        str: Storage name of the blob
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    name = blob_name(digest, content_type)
+
+    for _ in range(2):
+        if MediaBlob.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1, released_at=None):
+            return name
+
+        _write(name, content)
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(
+                    digest=digest,
+                    name=name,
+                    content_type=content_type,
+                    size=len(content),
+                    width=width,
+                    height=height,
+                    ref_count=1,
+                )
+            return name
+        except IntegrityError:
+            continue  # Created concurrently; take a reference to that row instead
+    raise IntegrityError(f"Could not acquire media blob {digest}")
+
+
+def release(*names) -> int:
+    """
+    Drop one reference per name; names that aren't blobs are ignored
+
+    Returns:
+        int: Number of blobs released
+    """
+    digests = [name.rsplit('/', 1)[-1].split('.', 1)[0] for name in names if is_blob(name)]
+    if not digests:
+        return 0
+
+    released = 0
+    for digest in digests:
+        released += MediaBlob.objects.filter(digest=digest, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1
+        )
+    MediaBlob.objects.filter(digest__in=digests, ref_count=0, released_at__isnull=True).update(
+        released_at=timezone.now()
+    )
+    return released
+
+
+def collect_unreferenced(grace_seconds=GC_GRACE_SECONDS, limit=1000) -> int:
+    """
+    Delete blobs unreferenced for longer than ``grace_seconds``
+
+    Each blob is re-checked under a row lock, so a concurrent acquire() either
+    wins (and the blob is kept) or waits and then stores the file again.
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+    candidates = list(
+        MediaBlob.objects.filter(ref_count=0, released_at__lt=cutoff)
+        .order_by('released_at').values_list('digest', flat=True)[:limit]
+    )
+
+    deleted = 0
+    for digest in candidates:
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(digest=digest, ref_count=0).first()
+            if blob is None:
+                continue
+            default_storage.delete(blob.name)
+            blob.delete()
+            deleted += 1
+    return deleted
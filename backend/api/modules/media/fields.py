@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from .signing import signed_url
+
+
+class SignedImageField(serializers.ImageField):
+    """ImageField whose URL carries an expiring signature (see media/signing.py)"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return signed_url(value.name, self.context.get('request'))
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class MediaBlob(models.Model):
+    """
+    A stored file addressed by the SHA-256 of its content
+
+    Rows referencing the file hold a reference each (see media/blobs.py);
+    unreferenced blobs are deleted by `manage.py collect_media_blobs`.
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When ref_count last dropped to zero; collection waits for a grace period
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'released_at'], name='media_blob_gc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
@@ -0,0 +1,48 @@
+"""
+Pillow helpers shared by the image pipelines.
+
+Everything is re-encoded as WebP without metadata, so EXIF (GPS position,
+device, timestamps) never leaves the server in a derivative.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+
+IMAGE_FORMAT = 'WEBP'
+CONTENT_TYPE = 'image/webp'
+IMAGE_QUALITY = 80
+
+# Errors Pillow raises for files it can't or won't decode
+DECODE_ERRORS = (OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+
+
+def open_upright(file) -> Image.Image:
+    """Decode an uploaded or stored image with its EXIF orientation applied"""
+    with file.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+
+def encode(image: Image.Image, max_side: int, square=False) -> Image.Image:
+    """
+    A copy of ``image`` fitting in max_side x max_side
+
+    With ``square`` the image is centre-cropped to exactly max_side x max_side.
+    """
+    if square:
+        return ImageOps.fit(image, (max_side, max_side), Image.Resampling.LANCZOS)
+    variant = image.copy()
+    variant.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    return variant
+
+
+def to_webp(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    # No exif/icc arguments: Pillow writes none unless asked to
+    image.save(buffer, IMAGE_FORMAT, quality=IMAGE_QUALITY, method=4)
+    return buffer.getvalue()
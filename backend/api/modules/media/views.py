@@ -0,0 +1,188 @@
+"""
+Serving of MEDIA_ROOT.
+
+Every file is authorized by where it lives:
+
+- ``blobs/``: content-addressed, public and immutable
+- ``profile_pictures/``: avatars uploaded before normalization, public
+- memory images and their variants: a valid signature (media/signing.py),
+  or an authenticated patient or caregiver of the owner
+
+Anything else is a 404. Responses carry ETag/Last-Modified and answer
+conditional requests with 304 and single byte ranges with 206. With
+MEDIA_ACCEL_REDIRECT set, the file itself is handed to the front server
+through X-Accel-Redirect once authorized.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+
+from ..memory.images import image_owner_id, is_memory_image
+from ..user.authentication import CachedJWTAuthentication
+from ..user.relationships import target_patient_id
+from . import signing
+from .blobs import is_blob
+
+
+# Blob names never change content, so clients and proxies may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PUBLIC_CACHE_CONTROL = 'public, max-age=86400'
+PUBLIC_PREFIXES = ('profile_pictures/',)
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    A single ``bytes=`` range as (start, end), inclusive
+
+    Returns:
+        None to serve the whole file (no header, multiple or malformed
+        ranges), or False if the range can't be satisfied
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def authorize(request, name):
+    """
+    The Cache-Control for ``name`` if the request may read it
+
+    Raises:
+        Http404: for unknown locations and unauthorized requests alike
+    """
+    if is_blob(name):
+        return IMMUTABLE_CACHE_CONTROL
+    if name.startswith(PUBLIC_PREFIXES):
+        return PUBLIC_CACHE_CONTROL
+    if not is_memory_image(name):
+        raise Http404("Media not found")
+
+    if signing.verify(name, request.GET.get('exp'), request.GET.get('sig')):
+        # Cacheable by the client until the signature expires
+        return f"private, max-age={max(int(request.GET['exp']) - int(time.time()), 0)}"
+
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        result = None
+    owner_id = image_owner_id(name) if result else None
+    if owner_id is None or target_patient_id(result[0]) != owner_id:
+        raise Http404("Media not found")
+    return 'private, no-cache'
+
+
+def file_response(request, name, cache_control, etag=None):
+    try:
+        path = default_storage.path(name)
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError, SuspiciousFileOperation):
+        raise Http404("Media not found")
+
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = etag or f'"{size:x}-{stat.st_mtime_ns:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _body_response(request, name, path, size, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    if response.status_code == 304:
+        response.headers.pop('Content-Type', None)
+    return response
+
+
+def _body_response(request, name, path, size, etag, last_modified):
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+    if accel_prefix:
+        # The front server streams the file and handles Range itself
+        response = HttpResponse(content_type=_content_type(name))
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(name)
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or if_range == etag or parse_http_date_safe(if_range) == last_modified:
+        byte_range = parse_range(request.headers.get('Range'), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        # FileResponse hands the open file to the server's sendfile when available
+        response = FileResponse(open(path, 'rb'), content_type=_content_type(name))
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(open(path, 'rb'), start, end - start + 1),
+        status=206,
+        content_type=_content_type(name)
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _content_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+@require_safe
+def serve_media(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    if name.startswith('..') or name != path:
+        raise Http404("Media not found")
+
+    cache_control = authorize(request, name)
+    etag = None
+    if is_blob(name):
+        # Content-addressed: the digest is the ETag
+        etag = f'"{posixpath.basename(name).split(".", 1)[0]}"'
+    return file_response(request, name, cache_control, etag)
@@ -0,0 +1,144 @@
+"""
+Resized derivatives of Memory images.
+
+Uploads are kept as-is; after the row commits, a worker pool renders one
+WebP per size in MEMORY_IMAGE_VARIANTS (EXIF orientation applied, metadata
+dropped) and records their storage names in ``Memory.image_variants``.
+Until that finishes the serializer simply returns no variants and clients
+fall back to the original.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from ..media.processing import DECODE_ERRORS, encode, open_upright, to_webp
+from ..media.signing import signed_url
+from .models import Memory
+
+
+DEFAULT_VARIANTS = {
+    # name: longest side in pixels
+    'thumb': 320,
+    'medium': 1280,
+}
+VARIANTS_DIR = 'src/imgs/variants'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_variant_sizes():
+    return getattr(settings, 'MEMORY_IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def generate_variants(memory: Memory) -> dict:
+    """
+    Render and store every configured size of the memory's image
+
+    Returns:
+        dict: {variant name: storage name}, empty if the image can't be decoded
+    """
+    if not memory.image:
+        return {}
+    try:
+        image = open_upright(memory.image)
+    except DECODE_ERRORS as e:
+        print(f"❌ Could not decode image of memory {memory.memory_id}: {str(e)}")
+        return {}
+
+    stem = os.path.splitext(os.path.basename(memory.image.name))[0]
+    variants = {}
+    for name, max_side in get_variant_sizes().items():
+        path = f"{VARIANTS_DIR}/{memory.memory_id}/{stem}_{name}.webp"
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        variants[name] = default_storage.save(path, ContentFile(to_webp(encode(image, max_side))))
+    return variants
+
+
+def process_memory(memory_id) -> bool:
+    """
+    Generate the variants of one memory and record them
+
+    The update is conditional on the image being unchanged, so a
+    replacement uploaded meanwhile isn't overwritten with stale variants.
+    """
+    memory = Memory.objects.filter(pk=memory_id).first()
+    if memory is None or not memory.image:
+        return False
+
+    variants = generate_variants(memory)
+    if not variants:
+        return False
+    updated = Memory.objects.filter(pk=memory_id, image=memory.image.name).update(image_variants=variants)
+    if not updated:
+        delete_files(variants)
+        return False
+    print(f"🖼️ Generated {len(variants)} image variants for memory {memory_id}")
+    return True
+
+
+def _run(memory_id):
+    try:
+        process_memory(memory_id)
+    except Exception as e:
+        print(f"❌ Image variants for memory {memory_id} failed: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(memory_id):
+    """Generate variants once the current transaction commits"""
+    def submit():
+        global _executor
+        if not getattr(settings, 'MEMORY_IMAGE_INLINE', True):
+            return
+        if _executor is None:
+            with _executor_lock:
+                if _executor is None:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=getattr(settings, 'MEMORY_IMAGE_WORKERS', 2),
+                        thread_name_prefix='memory-images'
+                    )
+        _executor.submit(_run, memory_id)
+
+    transaction.on_commit(submit)
+
+
+def delete_files(variants):
+    for name in (variants or {}).values():
+        try:
+            default_storage.delete(name)
+        except OSError:
+            pass
+
+
+def variant_urls(memory, request=None) -> dict:
+    """{variant name: signed URL}; absolute when a request is available, like ImageField"""
+    return {
+        name: signed_url(path, request)
+        for name, path in (memory.image_variants or {}).items()
+    }
+
+
+def is_memory_image(name) -> bool:
+    """Whether a storage name is a memory image or one of its variants"""
+    return name.startswith(Memory._meta.get_field('image').upload_to)
+
+
+def image_owner_id(name):
+    """Id of the patient owning a memory image or variant, or None"""
+    if name.startswith(f'{VARIANTS_DIR}/'):
+        memory_id = name[len(VARIANTS_DIR) + 1:].split('/', 1)[0]
+        try:
+            uuid.UUID(memory_id)
+        except ValueError:
+            return None
+        return Memory.objects.filter(pk=memory_id).values_list('user_id', flat=True).first()
+    return Memory.objects.filter(image=name).values_list('user_id', flat=True).first()
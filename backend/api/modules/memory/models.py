@@ -1,6 +1,8 @@
 import uuid
 from ..user.models import User  
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
 class Memory(models.Model):
  
@@ -10,6 +12,15 @@ class Memory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     description = models.CharField(max_length=255)
     image = models.ImageField(upload_to="src/imgs/", blank=True, null=True)
+    # Storage names of the resized copies of image (see memory/images.py)
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
-        return f"Memory {self.title} by {self.user.username}" 
\ No newline at end of file
+        return f"Memory {self.title} by {self.user.username}"
+
+
+@receiver(post_delete, sender=Memory)
+def delete_image_variants(sender, instance, **kwargs):
+    if instance.image_variants:
+        from .images import delete_files
+        delete_files(instance.image_variants)
@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from ..media.fields import SignedImageField
+from .images import variant_urls
 from .models import Memory
 
 class MemorySerializer(serializers.ModelSerializer):
+    # Memory photos are private; served to signed URLs only (see media/views.py)
+    image = SignedImageField(required=False, allow_null=True)
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Memory
         fields = (
@@ -10,6 +16,7 @@ class MemorySerializer(serializers.ModelSerializer):
             'created_at',
             'description',
             'image',
+            'image_variants',
             'user',
         )
         read_only_fields =  ('memory_id', 'created_at', 'user',)
@@ -19,4 +26,7 @@ class MemorySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "The title must be longer than 2 characters."
             )
-        return value
\ No newline at end of file
+        return value
+
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get('request'))
@@ -1,4 +1,6 @@
+from django.db import transaction
 from rest_framework import generics
+from .images import delete_files, schedule_variants
 from .models import Memory
 from .serializers import MemorySerializer
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -14,7 +16,9 @@ class MemoryListCreateView(generics.ListCreateAPIView):
         return Memory.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        memory = serializer.save(user=self.request.user)
+        if memory.image:
+            schedule_variants(memory.memory_id)
 
 class MemoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Memory.objects.all()
@@ -22,4 +26,16 @@ class MemoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Memory.objects.filter(user=self.request.user)
\ No newline at end of file
+        return Memory.objects.filter(user=self.request.user)
+
+    def perform_update(self, serializer):
+        if 'image' not in serializer.validated_data:
+            serializer.save()
+            return
+
+        stale = serializer.instance.image_variants
+        memory = serializer.save(image_variants={})
+        if stale:
+            transaction.on_commit(lambda: delete_files(stale))
+        if memory.image:
+            schedule_variants(memory.memory_id)
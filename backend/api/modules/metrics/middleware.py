@@ -0,0 +1,67 @@
+"""
+Request instrumentation middleware.
+
+Records query count, database time, serializer time, render time and total
+latency for every request into the in-process registry, keyed by method and
+URL pattern. Requests slower than METRICS_SLOW_REQUEST_MS are printed with
+their SQL. Streaming responses (the SSE location feed) are not recorded.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .profiling import RequestStats, bind
+from .registry import registry
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    route = match.route if match is not None else 'unmatched'
+    return f"{request.method} /{route}"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', None)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats(capture_sql=self.slow_ms is not None)
+        start = time.perf_counter()
+        with bind(stats), connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        stats.total_ms = (time.perf_counter() - start) * 1000
+
+        if response.streaming:
+            return response
+
+        render_started = getattr(request, '_metrics_render_started', None)
+        if render_started is not None:
+            stats.render_ms = (time.perf_counter() - render_started) * 1000
+
+        endpoint = endpoint_name(request)
+        registry.record(endpoint, response.status_code, stats)
+
+        if self.slow_ms is not None and stats.total_ms >= self.slow_ms:
+            self.log_slow_request(endpoint, response.status_code, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns
+        request._metrics_render_started = time.perf_counter()
+        return response
+
+    def log_slow_request(self, endpoint, status_code, stats):
+        print(
+            f"🐢 Slow request {endpoint} -> {status_code}: {stats.total_ms:.1f}ms total, "
+            f"{stats.queries} queries in {stats.db_ms:.1f}ms, serializer {stats.serializer_ms:.1f}ms"
+        )
+        for elapsed, sql in stats.sql:
+            print(f"    [{elapsed:.1f}ms] {sql}")
+        if stats.queries > len(stats.sql):
+            print(f"    ... {stats.queries - len(stats.sql)} more queries")
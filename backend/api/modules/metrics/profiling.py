@@ -0,0 +1,81 @@
+"""
+Per-request profiling state.
+
+RequestStats is bound to a context variable for the duration of a request
+by RequestMetricsMiddleware. Database time comes from a connection
+execute_wrapper; serializer time from a wrapper around
+``BaseSerializer.data`` installed once at startup (only the outermost
+serializer is timed, so nested serializers and the queries they trigger
+are counted inside their parent).
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from rest_framework.serializers import BaseSerializer
+
+
+# Statements kept per request for the slow-request log
+MAX_CAPTURED_QUERIES = 50
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self, capture_sql=False):
+        self.capture_sql = capture_sql
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.sql = []
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += elapsed
+            if self.capture_sql and len(self.sql) < MAX_CAPTURED_QUERIES:
+                self.sql.append((round(elapsed, 3), sql))
+
+
+def current_stats():
+    return _current.get()
+
+
+@contextmanager
+def bind(stats):
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+_original_data = BaseSerializer.data
+
+
+def _timed_data(self):
+    stats = _current.get()
+    if stats is None:
+        return _original_data.fget(self)
+    stats._serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_data.fget(self)
+    finally:
+        stats._serializer_depth -= 1
+        if not stats._serializer_depth:
+            stats.serializer_ms += (time.perf_counter() - start) * 1000
+
+
+def install_serializer_timing():
+    """Idempotent; called from ApiConfig.ready()"""
+    if BaseSerializer.data is _original_data:
+        BaseSerializer.data = property(_timed_data)
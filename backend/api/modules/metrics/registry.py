@@ -0,0 +1,103 @@
+"""
+In-process request metrics.
+
+Each endpoint keeps fixed-bucket histograms for total latency, database
+time, serializer time, render time and query count. Buckets make recording O(1) and memory
+constant; percentiles are reported as the upper bound of the bucket that
+contains them.
+"""
+import bisect
+import threading
+
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+        }
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.serializer_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.render_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "total_ms": self.total_ms.snapshot(),
+            "db_ms": self.db_ms.snapshot(),
+            "serializer_ms": self.serializer_ms.snapshot(),
+            "render_ms": self.render_ms.snapshot(),
+            "queries": self.queries.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, status_code, stats):
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = EndpointMetrics()
+            metrics.requests += 1
+            if status_code >= 500:
+                metrics.errors += 1
+            metrics.total_ms.observe(stats.total_ms)
+            metrics.db_ms.observe(stats.db_ms)
+            metrics.serializer_ms.observe(stats.serializer_ms)
+            metrics.render_ms.observe(stats.render_ms)
+            metrics.queries.observe(stats.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: metrics.snapshot() for endpoint, metrics in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
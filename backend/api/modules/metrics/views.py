@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .registry import registry
+
+
+class MetricsView(APIView):
+    """
+    GET: Per-endpoint request metrics of this process (staff only)
+    DELETE: Reset them
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"endpoints": registry.snapshot()})
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,48 @@
+import uuid
+from django.db import models
+from django.utils import timezone
+
+
+class PushNotification(models.Model):
+    """Outbox row for a push message waiting to be delivered through Expo"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENT = 'sent'
+        FAILED = 'failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    push_token = models.CharField(max_length=255)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    sound = models.CharField(max_length=20, default='default')
+    priority = models.CharField(max_length=20, default='high')
+    channel_id = models.CharField(max_length=50, default='emergency-alerts')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    ticket_id = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='push_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} -> {self.push_token[:20]} ({self.status})"
+
+    def to_message(self):
+        return {
+            "to": self.push_token,
+            "sound": self.sound,
+            "title": self.title,
+            "body": self.body,
+            "data": self.data,
+            "priority": self.priority,
+            "channelId": self.channel_id,
+        }
@@ -1,12 +1,63 @@
 """
 Push Notification Service using Expo Push API
+
+Notifications are written to the PushNotification outbox and delivered in
+batches by a worker pool, so request handlers never wait on Expo.
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional, Dict, Any, List
+
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import PushNotification
 
 
 EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
 
+# Expo accepts at most 100 messages per request
+EXPO_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5
+# Claimed rows are pushed this far into the future; if the worker dies they come back
+CLAIM_TIMEOUT_SECONDS = 60
+
+# Ticket errors that will never succeed on retry
+PERMANENT_ERRORS = {"DeviceNotRegistered", "InvalidCredentials", "MessageTooBig"}
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+# Wakes the worker pool when the earliest retry or expired claim falls due
+_retry_timer = None
+_retry_timer_due = None
+
+
+def get_session() -> requests.Session:
+    """Process-wide HTTP session so connections to Expo are reused"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+                session.headers.update({
+                    "Accept": "application/json",
+                    "Accept-Encoding": "gzip, deflate",
+                    "Content-Type": "application/json"
+                })
+                _session = session
+    return _session
+
+
+def is_valid_token(push_token: Optional[str]) -> bool:
+    return bool(push_token) and push_token.startswith("ExponentPushToken")
+
 
 def send_push_notification(
     push_token: str,
@@ -17,8 +68,10 @@ def send_push_notification(
     priority: str = "high"
 ) -> bool:
     """
-    Send a push notification via Expo Push Service
-    
+    Send a push notification via Expo Push Service, synchronously
+
+    Prefer enqueue_push_notification from request handlers.
+
     Args:
         push_token: Expo push token (starts with ExponentPushToken[...])
         title: Notification title
@@ -26,14 +79,14 @@ def send_push_notification(
         data: Optional dictionary of additional data
         sound: Notification sound (default: "default")
         priority: Notification priority (default: "high")
-    
+
     Returns:
         bool: True if sent successfully, False otherwise
     """
-    if not push_token or not push_token.startswith("ExponentPushToken"):
+    if not is_valid_token(push_token):
         print(f"Invalid push token: {push_token}")
         return False
-    
+
     payload = {
         "to": push_token,
         "sound": sound,
@@ -43,31 +96,14 @@ def send_push_notification(
         "priority": priority,
         "channelId": "emergency-alerts"  # Custom channel for emergency alerts
     }
-    
+
     try:
-        response = requests.post(
-            EXPO_PUSH_URL,
-            json=payload,
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json"
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("data") and result["data"][0].get("status") == "ok":
-                print(f"✅ Push notification sent successfully to {push_token[:20]}...")
-                return True
-            else:
-                error = result.get("data", [{}])[0].get("message", "Unknown error")
-                print(f"❌ Push notification failed: {error}")
-                return False
-        else:
-            print(f"❌ Push API error: {response.status_code} - {response.text}")
-            return False
-            
+        ticket = send_push_batch([payload])[0]
+        if ticket.get("status") == "ok":
+            print(f"✅ Push notification sent successfully to {push_token[:20]}...")
+            return True
+        print(f"❌ Push notification failed: {ticket.get('message', 'Unknown error')}")
+        return False
     except requests.RequestException as e:
         print(f"❌ Network error sending push notification: {str(e)}")
         return False
@@ -76,20 +112,200 @@ def send_push_notification(
         return False
 
 
+def send_push_batch(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Send up to EXPO_BATCH_SIZE messages in one request
+
+    Returns:
+        list: One Expo ticket per message, in order
+
+    Raises:
+        requests.RequestException: on network errors or a non-200 response
+    """
+    response = get_session().post(EXPO_PUSH_URL, json=messages, timeout=10)
+    response.raise_for_status()
+    tickets = response.json().get("data") or []
+    if isinstance(tickets, dict):
+        tickets = [tickets]
+    if len(tickets) != len(messages):
+        raise requests.RequestException(
+            f"Expo returned {len(tickets)} tickets for {len(messages)} messages"
+        )
+    return tickets
+
+
+def enqueue_push_notification(
+    push_token: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, Any]] = None,
+    sound: str = "default",
+    priority: str = "high"
+) -> bool:
+    """
+    Queue a push notification for background delivery
+
+    Returns:
+        bool: True if queued, False if the token is invalid
+    """
+    if not is_valid_token(push_token):
+        print(f"Invalid push token: {push_token}")
+        return False
+
+    PushNotification.objects.create(
+        push_token=push_token,
+        title=title,
+        body=body,
+        data=data or {},
+        sound=sound,
+        priority=priority
+    )
+    transaction.on_commit(schedule_dispatch)
+    return True
+
+
+def _claim_due(limit: int) -> List[PushNotification]:
+    """Lock and lease the next due notifications so concurrent workers skip them"""
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            PushNotification.objects.select_for_update(skip_locked=True).filter(
+                status=PushNotification.Status.PENDING,
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:limit]
+        )
+        if due:
+            PushNotification.objects.filter(pk__in=[n.pk for n in due]).update(
+                next_attempt_at=now + timedelta(seconds=CLAIM_TIMEOUT_SECONDS)
+            )
+    return due
+
+
+def _retry_later(notification: PushNotification, error: str, now):
+    notification.attempts += 1
+    notification.error = error
+    if notification.attempts >= MAX_ATTEMPTS:
+        notification.status = PushNotification.Status.FAILED
+    else:
+        delay = RETRY_BASE_SECONDS * 2 ** (notification.attempts - 1)
+        notification.next_attempt_at = now + timedelta(seconds=delay)
+
+
+def dispatch_pending(limit: int = EXPO_BATCH_SIZE) -> int:
+    """
+    Deliver one batch of due notifications and record each ticket
+
+    Returns:
+        int: Number of notifications processed
+    """
+    batch = _claim_due(min(limit, EXPO_BATCH_SIZE))
+    if not batch:
+        return 0
+
+    now = timezone.now()
+    try:
+        tickets = send_push_batch([notification.to_message() for notification in batch])
+    except Exception as e:
+        print(f"❌ Push batch of {len(batch)} failed: {str(e)}")
+        for notification in batch:
+            _retry_later(notification, str(e), now)
+    else:
+        for notification, ticket in zip(batch, tickets):
+            if ticket.get("status") == "ok":
+                notification.status = PushNotification.Status.SENT
+                notification.ticket_id = ticket.get("id", "")
+                notification.sent_at = now
+                notification.error = ""
+                continue
+
+            error = (ticket.get("details") or {}).get("error") or ticket.get("message", "Unknown error")
+            if error in PERMANENT_ERRORS:
+                notification.attempts += 1
+                notification.status = PushNotification.Status.FAILED
+                notification.error = error
+            else:
+                _retry_later(notification, error, now)
+
+    PushNotification.objects.bulk_update(
+        batch,
+        ['status', 'attempts', 'next_attempt_at', 'ticket_id', 'error', 'sent_at']
+    )
+    sent = sum(1 for notification in batch if notification.status == PushNotification.Status.SENT)
+    print(f"📨 Push batch processed: {sent}/{len(batch)} sent")
+    return len(batch)
+
+
+def drain() -> int:
+    """Dispatch batches until nothing is due"""
+    total = 0
+    try:
+        while True:
+            processed = dispatch_pending()
+            if not processed:
+                break
+            total += processed
+        _schedule_retry()
+    finally:
+        close_old_connections()
+    return total
+
+
+def _schedule_retry():
+    """
+    In inline mode, drain again when the next pending notification falls due
+
+    Retries and expired claims are only due later, and nothing else would
+    wake the pool for them until an unrelated notification is queued.
+    """
+    global _retry_timer, _retry_timer_due
+    if not getattr(settings, 'PUSH_DISPATCH_INLINE', True):
+        return
+    next_due = PushNotification.objects.filter(
+        status=PushNotification.Status.PENDING
+    ).order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first()
+    if next_due is None:
+        return
+    with _session_lock:
+        if _retry_timer is not None and _retry_timer.is_alive() and _retry_timer_due <= next_due:
+            return
+        if _retry_timer is not None:
+            _retry_timer.cancel()
+        delay = max((next_due - timezone.now()).total_seconds(), 0)
+        _retry_timer = threading.Timer(delay, schedule_dispatch)
+        _retry_timer.daemon = True
+        _retry_timer_due = next_due
+        _retry_timer.start()
+
+
+def schedule_dispatch():
+    """Wake the in-process worker pool, unless delivery runs as a separate worker"""
+    global _executor
+    if not getattr(settings, 'PUSH_DISPATCH_INLINE', True):
+        return
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'PUSH_DISPATCH_WORKERS', 2),
+                    thread_name_prefix='push-dispatch'
+                )
+    _executor.submit(drain)
+
+
 def send_emergency_alert(caregiver_token: str, patient_name: str, latitude: float, longitude: float) -> bool:
     """
-    Send emergency alert when patient exits safe zone
-    
+    Queue emergency alert when patient exits safe zone
+
     Args:
         caregiver_token: Caregiver's Expo push token
         patient_name: Name of the patient
         latitude: Patient's current latitude
         longitude: Patient's current longitude
-    
+
     Returns:
-        bool: True if sent successfully
+        bool: True if queued successfully
     """
-    return send_push_notification(
+    return enqueue_push_notification(
         push_token=caregiver_token,
         title="🚨 ALERTA: Paciente fuera de zona segura",
         body=f"{patient_name} ha salido del área segura",
@@ -97,7 +313,7 @@ def send_emergency_alert(caregiver_token: str, patient_name: str, latitude: floa
             "type": "zone_exit",
             "latitude": latitude,
             "longitude": longitude,
-            "timestamp": str(requests.utils.default_headers())  # Current timestamp
+            "timestamp": timezone.now().isoformat()
         },
         sound="default",
         priority="high"
@@ -0,0 +1,77 @@
+"""
+Stationary-point deduplication at ingest.
+
+A ping close to the previous stored point, shortly after it and in the same
+zone state extends that row (ended_at, sample_count) instead of inserting a
+new one. Zone state is evaluated before merging and transitions never
+merge, so exit detection is unaffected.
+"""
+from django.conf import settings
+
+from .geofence import ZoneState, haversine_meters
+
+
+DEFAULT_DWELL = {
+    'DISTANCE_METERS': 20,
+    'MAX_GAP_SECONDS': 120,
+}
+
+
+def get_dwell_settings():
+    return {**DEFAULT_DWELL, **getattr(settings, 'LOCATION_DWELL', {})}
+
+
+def can_merge(anchor, latitude, longitude, timestamp, is_out_of_zone, config=None) -> bool:
+    """
+    Whether a sample belongs to the dwell started at ``anchor``
+
+    Args:
+        anchor: ZoneState of the last stored point
+        timestamp: POSIX seconds of the new sample
+    """
+    if anchor.location_id is None or anchor.timestamp is None:
+        return False
+    if anchor.is_out_of_zone != bool(is_out_of_zone):
+        return False
+    config = config or get_dwell_settings()
+    gap = timestamp - anchor.timestamp
+    if gap < 0 or gap > config['MAX_GAP_SECONDS']:
+        return False
+    distance = haversine_meters(anchor.latitude, anchor.longitude, [(float(latitude), float(longitude))])[0]
+    return distance <= config['DISTANCE_METERS']
+
+
+def merge_batch(locations):
+    """
+    Collapse runs of stationary points in an ordered batch, in memory
+
+    Returns:
+        list: The rows to insert; merged rows carry ended_at and sample_count
+    """
+    config = get_dwell_settings()
+    kept = []
+    anchor = None
+    for location in locations:
+        if anchor is not None and can_merge(
+            anchor,
+            location.latitude,
+            location.longitude,
+            location.timestamp.timestamp(),
+            location.is_out_of_zone,
+            config
+        ):
+            current = kept[-1]
+            current.ended_at = location.timestamp
+            current.sample_count += 1
+            anchor = anchor._replace(timestamp=location.timestamp.timestamp())
+            continue
+
+        kept.append(location)
+        anchor = ZoneState(
+            location.is_out_of_zone,
+            location.timestamp.timestamp(),
+            str(location.location_id),
+            float(location.latitude),
+            float(location.longitude),
+        )
+    return kept
@@ -0,0 +1,161 @@
+"""
+Server-side geofence evaluation for patient locations.
+
+Zone records and the last inside/outside state of each patient are kept in
+the Django cache, so evaluating a ping costs no queries in the common case
+and exit detection is O(1) instead of scanning LocationHistory.
+"""
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+
+from .models import SafeZone, LocationHistory
+
+
+EARTH_RADIUS_METERS = 6371008.8
+
+ZONE_CACHE_TIMEOUT = 5 * 60
+STATE_CACHE_TIMEOUT = 30 * 60
+
+_NO_ZONE = 'none'
+
+
+class ZoneRecord(NamedTuple):
+    latitude: float
+    longitude: float
+    radius_meters: int
+    safe_exit_active: bool
+
+
+class ZoneState(NamedTuple):
+    is_out_of_zone: bool
+    timestamp: Optional[float]  # POSIX seconds of the last sample stored
+    location_id: Optional[str] = None  # Row holding that sample
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+def _zone_key(patient_id):
+    return f'safe_zone:zone:{patient_id}'
+
+
+def _state_key(patient_id):
+    return f'safe_zone:state:{patient_id}'
+
+
+def haversine_meters(latitude: float, longitude: float, points: Sequence[Tuple[float, float]]) -> List[float]:
+    """Distances in meters from one origin to many (latitude, longitude) points"""
+    lat0 = math.radians(latitude)
+    lon0 = math.radians(longitude)
+    cos_lat0 = math.cos(lat0)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+
+    distances = []
+    for lat, lon in points:
+        lat1 = radians(lat)
+        half_dlat = (lat1 - lat0) / 2
+        half_dlon = (radians(lon) - lon0) / 2
+        a = sin(half_dlat) ** 2 + cos_lat0 * cos(lat1) * sin(half_dlon) ** 2
+        distances.append(2 * EARTH_RADIUS_METERS * asin(min(1.0, sqrt(a))))
+    return distances
+
+
+def get_zone(patient_id) -> Optional[ZoneRecord]:
+    """Cached zone of the patient, or None if no safe zone is configured"""
+    record = cache.get(_zone_key(patient_id))
+    if record is None:
+        zone = SafeZone.objects.filter(user_id=patient_id).values(
+            'latitude', 'longitude', 'radius_meters', 'safe_exit_active'
+        ).first()
+        record = (
+            float(zone['latitude']),
+            float(zone['longitude']),
+            zone['radius_meters'],
+            zone['safe_exit_active'],
+        ) if zone else _NO_ZONE
+        cache.set(_zone_key(patient_id), record, ZONE_CACHE_TIMEOUT)
+    return None if record == _NO_ZONE else ZoneRecord(*record)
+
+
+def invalidate_zone(patient_id):
+    """Drop the cached zone; must be called after every SafeZone write"""
+    cache.delete(_zone_key(patient_id))
+
+
+def invalidate_state(patient_id):
+    """Drop the cached inside/outside state; call when history is deleted"""
+    cache.delete(_state_key(patient_id))
+
+
+def evaluate(zone: Optional[ZoneRecord], points: Sequence[Tuple[float, float]], fallback: Sequence[bool]) -> List[bool]:
+    """
+    Out-of-zone flag for every point.
+
+    Without a configured zone there is nothing to measure against, so the
+    flags reported by the device are used as-is.
+    """
+    if zone is None:
+        return [bool(flag) for flag in fallback]
+    distances = haversine_meters(zone.latitude, zone.longitude, points)
+    return [distance > zone.radius_meters for distance in distances]
+
+
+def get_state(patient_id, before=None) -> ZoneState:
+    """
+    Last known state of the patient.
+
+    ``before`` (a datetime) asks for the state right before that instant;
+    the cached state answers it when it is older, otherwise the preceding
+    stored point is looked up.
+    """
+    state = cache.get(_state_key(patient_id))
+    if state is not None:
+        state = ZoneState(*state)
+        if before is None or (state.timestamp is not None and state.timestamp <= before.timestamp()):
+            return state
+
+    history = LocationHistory.objects.filter(user_id=patient_id)
+    if before is not None:
+        history = history.filter(timestamp__lt=before)
+    latest = history.order_by('-timestamp').first()
+    if latest is None:
+        return ZoneState(False, None)
+
+    found = _state_of(latest)
+    if before is None:
+        cache.set(_state_key(patient_id), tuple(found), STATE_CACHE_TIMEOUT)
+    return found
+
+
+def _state_of(location) -> ZoneState:
+    return ZoneState(
+        bool(location.is_out_of_zone),
+        (location.ended_at or location.timestamp).timestamp(),
+        str(location.location_id),
+        float(location.latitude),
+        float(location.longitude),
+    )
+
+
+def set_state(patient_id, location):
+    """Record the state set by a stored point, unless a newer one is known"""
+    state = _state_of(location)
+    current = cache.get(_state_key(patient_id))
+    if current is not None and current[1] is not None and current[1] > state.timestamp:
+        return
+    cache.set(_state_key(patient_id), tuple(state), STATE_CACHE_TIMEOUT)
+
+
+ZONE_EXIT = 'zone_exit'
+ZONE_ENTER = 'zone_enter'
+
+
+def find_transitions(previous: bool, flags: Sequence[bool]) -> Dict[int, str]:
+    """Index -> ZONE_EXIT / ZONE_ENTER for every point that changes the state"""
+    transitions = {}
+    for index, flag in enumerate(flags):
+        if flag != previous:
+            transitions[index] = ZONE_EXIT if flag else ZONE_ENTER
+        previous = flag
+    return transitions
@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 from ..user.models import User 
 
 class SafeZone(models.Model):
@@ -21,11 +22,45 @@ class LocationHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='location_history')
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Client time for replayed points
     is_out_of_zone = models.BooleanField(default=False)
+    ended_at = models.DateTimeField(null=True, blank=True)  # Last sample merged into this dwell
+    sample_count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)  # Server write time, drives the "since" cursor
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', 'timestamp'], name='location_user_ts_idx'),
+            models.Index(fields=['user', 'updated_at'], name='location_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.timestamp}"
+
+class LocationTrack(models.Model):
+    """Downsampled history: one averaged point per patient per time bucket"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='location_tracks')
+    bucket_start = models.DateTimeField()
+    bucket_seconds = models.PositiveIntegerField()
+    latitude_e6 = models.IntegerField()  # Microdegrees
+    longitude_e6 = models.IntegerField()
+    sample_count = models.PositiveIntegerField()
+    is_out_of_zone = models.BooleanField(default=False)  # Any sample in the bucket was outside
+
+    class Meta:
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'bucket_start'], name='location_track_user_bucket_uniq'),
+        ]
+
+    @property
+    def latitude(self):
+        return self.latitude_e6 / 1_000_000
+
+    @property
+    def longitude(self):
+        return self.longitude_e6 / 1_000_000
+
+    def __str__(self):
+        return f"{self.user.username} - {self.bucket_start} ({self.sample_count})"
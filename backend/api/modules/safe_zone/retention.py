@@ -0,0 +1,95 @@
+"""
+Retention tiers for location history.
+
+Recent raw points stay in LocationHistory; older ones are averaged into
+fixed time buckets in LocationTrack (integer microdegrees) and the raw rows
+are deleted in bulk. Buckets past the track window are expired.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import LocationHistory, LocationTrack
+
+
+DEFAULT_RETENTION = {
+    'RAW_DAYS': 7,
+    'TRACK_BUCKET_SECONDS': 300,
+    'TRACK_DAYS': 180,
+}
+
+
+def get_retention():
+    return {**DEFAULT_RETENTION, **getattr(settings, 'LOCATION_HISTORY_RETENTION', {})}
+
+
+def bucket_floor(moment, bucket_seconds):
+    """Start of the bucket containing ``moment``"""
+    seconds = int(moment.timestamp()) // bucket_seconds * bucket_seconds
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def raw_cutoff(raw_days, bucket_seconds, now=None):
+    """Compaction cutoff aligned to a bucket boundary, so no bucket is split"""
+    return bucket_floor((now or timezone.now()) - timedelta(days=raw_days), bucket_seconds)
+
+
+def build_tracks(user_id, cutoff, bucket_seconds):
+    """Average the patient's raw points older than ``cutoff`` into buckets"""
+    points = LocationHistory.objects.filter(
+        user_id=user_id, timestamp__lt=cutoff
+    ).order_by('timestamp').values_list(
+        'timestamp', 'latitude', 'longitude', 'is_out_of_zone', 'sample_count'
+    ).iterator(chunk_size=5000)
+
+    tracks = []
+    current = None
+    for timestamp, latitude, longitude, is_out_of_zone, sample_count in points:
+        start = bucket_floor(timestamp, bucket_seconds)
+        if current is None or current.bucket_start != start:
+            if current is not None:
+                tracks.append(current)
+            current = LocationTrack(
+                user_id=user_id,
+                bucket_start=start,
+                bucket_seconds=bucket_seconds,
+                latitude_e6=0,
+                longitude_e6=0,
+                sample_count=0,
+            )
+        # Dwell rows stand for several samples and weigh accordingly
+        current.latitude_e6 += int(latitude * 1_000_000) * sample_count
+        current.longitude_e6 += int(longitude * 1_000_000) * sample_count
+        current.sample_count += sample_count
+        current.is_out_of_zone = current.is_out_of_zone or is_out_of_zone
+    if current is not None:
+        tracks.append(current)
+
+    for track in tracks:
+        track.latitude_e6 = round(track.latitude_e6 / track.sample_count)
+        track.longitude_e6 = round(track.longitude_e6 / track.sample_count)
+    return tracks
+
+
+def compact_user_history(user_id, cutoff, bucket_seconds):
+    """
+    Move one patient's raw points older than ``cutoff`` into LocationTrack
+
+    Returns:
+        tuple: (tracks created, raw rows deleted)
+    """
+    with transaction.atomic():
+        tracks = build_tracks(user_id, cutoff, bucket_seconds)
+        # A rerun after a crash recomputes the same buckets; keep the existing ones
+        LocationTrack.objects.bulk_create(tracks, batch_size=1000, ignore_conflicts=True)
+        deleted, _ = LocationHistory.objects.filter(user_id=user_id, timestamp__lt=cutoff).delete()
+    return len(tracks), deleted
+
+
+def expire_tracks(track_days, now=None):
+    """Delete downsampled buckets older than the track window"""
+    cutoff = (now or timezone.now()) - timedelta(days=track_days)
+    deleted, _ = LocationTrack.objects.filter(bucket_start__lt=cutoff).delete()
+    return deleted
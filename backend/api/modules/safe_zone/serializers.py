@@ -10,5 +10,18 @@ class SafeZoneSerializer(serializers.ModelSerializer):
 class LocationHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = LocationHistory
-        fields = ['location_id', 'user', 'latitude', 'longitude', 'timestamp', 'is_out_of_zone']
-        read_only_fields = ['user', 'timestamp']
+        fields = ['location_id', 'user', 'latitude', 'longitude', 'timestamp', 'ended_at', 'sample_count', 'is_out_of_zone']
+        read_only_fields = ['user', 'timestamp', 'ended_at', 'sample_count']
+
+class LocationPointSerializer(serializers.Serializer):
+    """Single point of an offline batch, with the time it was recorded on the device"""
+    latitude = serializers.DecimalField(max_digits=9, decimal_places=6)
+    longitude = serializers.DecimalField(max_digits=9, decimal_places=6)
+    is_out_of_zone = serializers.BooleanField(default=False)
+    recorded_at = serializers.DateTimeField(required=False)
+
+class LocationBatchSerializer(serializers.Serializer):
+    """Ordered list of points replayed from the mobile offline queue"""
+    MAX_POINTS = 500
+
+    points = LocationPointSerializer(many=True, allow_empty=False, max_length=MAX_POINTS)
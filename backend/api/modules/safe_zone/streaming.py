@@ -0,0 +1,130 @@
+"""
+Real-time location feed for caregivers.
+
+Accepted points and zone transitions are published on a per-patient
+channel; the SSE view in views.py subscribes caregivers to it. The default
+broker is in-process (publishers and subscribers must share a process, e.g.
+a single ASGI worker) and mirrors the publish/subscribe surface of a Redis
+client, so a shared broker can be swapped in through
+``LOCATION_STREAM_BROKER``.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Dict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One subscriber's view of a channel, consumed from its event loop"""
+
+    def __init__(self, broker, channel, loop):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop; a slow reader loses its oldest messages
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get_message(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def unsubscribe(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process pub/sub; publish() is safe to call from any thread"""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel) -> Subscription:
+        subscription = Subscription(self, channel, asyncio.get_running_loop())
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, message) -> int:
+        """Returns the number of subscribers that received the message"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # Loop already closed; the subscription is being torn down
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'LOCATION_STREAM_BROKER', 'api.modules.safe_zone.streaming.LocalBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def patient_channel(patient_id):
+    return f'location:{patient_id}'
+
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def publish_location(location, transition=None):
+    """
+    Publish an accepted point, and the zone transition it caused if any
+
+    Args:
+        location: Saved LocationHistory row
+        transition: "zone_exit", "zone_enter" or None
+    """
+    broker = get_broker()
+    channel = patient_channel(location.user_id)
+    broker.publish(channel, format_event('location', {
+        "location_id": str(location.location_id),
+        "latitude": str(location.latitude),
+        "longitude": str(location.longitude),
+        "timestamp": location.timestamp.isoformat(),
+        # Set on dwell rows extended by stationary pings; the last time the patient was seen
+        "ended_at": location.ended_at.isoformat() if location.ended_at else None,
+        "sample_count": location.sample_count,
+        "is_out_of_zone": location.is_out_of_zone,
+    }))
+    if transition:
+        broker.publish(channel, format_event(transition, {
+            "latitude": str(location.latitude),
+            "longitude": str(location.longitude),
+            "timestamp": location.timestamp.isoformat(),
+        }))
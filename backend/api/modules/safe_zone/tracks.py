@@ -0,0 +1,128 @@
+"""
+Simplified patient tracks for long time windows.
+
+Raw points and downsampled LocationTrack buckets in the window are merged
+and reduced to a point budget with Visvalingam-Whyatt (drop the point that
+spans the smallest triangle until the budget is met). Results are cached
+per (patient, window, budget) and keyed on the patient's newest write, so
+new points invalidate them.
+"""
+import heapq
+import math
+from typing import List, Tuple
+
+from django.core.cache import cache
+
+from .models import LocationHistory, LocationTrack
+
+
+TRACK_CACHE_TIMEOUT = 10 * 60
+
+# (timestamp, latitude, longitude, is_out_of_zone)
+Point = Tuple[object, float, float, bool]
+
+
+def load_points(patient_id, start, end) -> List[Point]:
+    """Raw and downsampled points of the patient in [start, end], oldest first"""
+    raw = LocationHistory.objects.filter(
+        user_id=patient_id, timestamp__gte=start, timestamp__lte=end
+    ).order_by('timestamp').values_list('timestamp', 'latitude', 'longitude', 'is_out_of_zone')
+
+    points = [
+        (timestamp, float(latitude), float(longitude), is_out_of_zone)
+        for timestamp, latitude, longitude, is_out_of_zone in raw.iterator(chunk_size=5000)
+    ]
+
+    # Buckets only exist where raw points were compacted away, so they never overlap
+    oldest_raw = points[0][0] if points else end
+    buckets = LocationTrack.objects.filter(
+        user_id=patient_id, bucket_start__gte=start, bucket_start__lt=oldest_raw
+    ).order_by('bucket_start').values_list('bucket_start', 'latitude_e6', 'longitude_e6', 'is_out_of_zone')
+
+    return [
+        (bucket_start, latitude_e6 / 1_000_000, longitude_e6 / 1_000_000, is_out_of_zone)
+        for bucket_start, latitude_e6, longitude_e6, is_out_of_zone in buckets
+    ] + points
+
+
+def simplify(points: List[Point], budget: int) -> List[Point]:
+    """
+    Reduce ``points`` to at most ``budget`` points, keeping both ends.
+
+    Coordinates are projected to a local plane (equirectangular) so that
+    triangle areas are comparable in every direction.
+    """
+    count = len(points)
+    if count <= budget or count <= 2:
+        return points
+    budget = max(budget, 2)
+
+    scale = math.cos(math.radians(sum(point[1] for point in points) / count))
+    xs = [point[2] * scale for point in points]
+    ys = [point[1] for point in points]
+
+    def area(a, b, c):
+        return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2
+
+    previous = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    removed = [False] * count
+    version = [0] * count
+
+    heap = [(area(i - 1, i, i + 1), i, 0) for i in range(1, count - 1)]
+    heapq.heapify(heap)
+
+    remaining = count
+    while remaining > budget and heap:
+        _, index, seen = heapq.heappop(heap)
+        if removed[index] or seen != version[index]:
+            continue  # Stale entry; the neighbours changed since it was pushed
+        removed[index] = True
+        remaining -= 1
+
+        before, after = previous[index], following[index]
+        following[before] = after
+        previous[after] = before
+        for neighbour in (before, after):
+            if 0 < neighbour < count - 1:
+                version[neighbour] += 1
+                heapq.heappush(heap, (
+                    area(previous[neighbour], neighbour, following[neighbour]),
+                    neighbour,
+                    version[neighbour],
+                ))
+
+    return [point for point, dropped in zip(points, removed) if not dropped]
+
+
+def get_simplified_track(patient_id, start, end, budget):
+    """
+    Cached simplified track
+
+    Returns:
+        dict: {"source_points": int, "points": [...]}
+    """
+    latest = LocationHistory.objects.filter(user_id=patient_id).order_by(
+        '-updated_at'
+    ).values_list('updated_at', flat=True).first()
+    key = (
+        f'safe_zone:track:{patient_id}:{start.timestamp():.0f}:{end.timestamp():.0f}:'
+        f'{budget}:{latest.timestamp() if latest else 0}'
+    )
+    track = cache.get(key)
+    if track is None:
+        points = load_points(patient_id, start, end)
+        track = {
+            "source_points": len(points),
+            "points": [
+                {
+                    "latitude": round(latitude, 6),
+                    "longitude": round(longitude, 6),
+                    "timestamp": timestamp.isoformat(),
+                    "is_out_of_zone": is_out_of_zone,
+                }
+                for timestamp, latitude, longitude, is_out_of_zone in simplify(points, budget)
+            ],
+        }
+        cache.set(key, track, TRACK_CACHE_TIMEOUT)
+    return track
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import SafeZoneListCreateView, LocationUpdateView, LocationHistoryView, SafeExitToggleView
+from .views import SafeZoneListCreateView, LocationUpdateView, LocationBatchUpdateView, LocationHistoryView, LocationTrackView, LocationStreamView, SafeExitToggleView
 
 urlpatterns = [
     path('zone/', SafeZoneListCreateView.as_view(), name='safe-zone-list-create'),
     path('location/update/', LocationUpdateView.as_view(), name='location-update'),
+    path('location/batch/', LocationBatchUpdateView.as_view(), name='location-batch-update'),
     path('location/history/', LocationHistoryView.as_view(), name='location-history'),
+    path('location/track/', LocationTrackView.as_view(), name='location-track'),
+    path('location/stream/', LocationStreamView.as_view(), name='location-stream'),
     path('safe-exit/toggle/', SafeExitToggleView.as_view(), name='safe-exit-toggle'),
 ]
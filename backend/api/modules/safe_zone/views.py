@@ -1,9 +1,25 @@
+import asyncio
+import hashlib
+import uuid
+from asgiref.sync import sync_to_async
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from datetime import timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views import View
 from .models import SafeZone, LocationHistory
-from .serializers import SafeZoneSerializer, LocationHistorySerializer
+from .serializers import SafeZoneSerializer, LocationHistorySerializer, LocationBatchSerializer
 from ..user.models import User
+from ..user.authentication import CachedJWTAuthentication
+from ..user.relationships import get_resolver, caregivers_of, target_patient_id
+from ..throttling.throttles import TokenBucketThrottle
+from . import dwell, geofence, streaming, tracks
 
 class SafeZoneListCreateView(generics.ListCreateAPIView):
     serializer_class = SafeZoneSerializer
@@ -11,103 +27,394 @@ class SafeZoneListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         # Return safe zone for the current user (if patient) or their patient (if caregiver)
-        user = self.request.user
-        if user.user_type == User.UserType.PATIENT:
-            return SafeZone.objects.filter(user=user)
-        elif user.user_type == User.UserType.CAREGIVER and user.patient:
-            return SafeZone.objects.filter(user=user.patient)
-        return SafeZone.objects.none()
+        patient_id = get_resolver(self.request).patient_id
+        if patient_id is None:
+            return SafeZone.objects.none()
+        return SafeZone.objects.filter(user_id=patient_id)
 
     def perform_create(self, serializer):
         # Create safe zone for the current user (if patient) or their patient (if caregiver)
         user = self.request.user
-        target_user = user
-        if user.user_type == User.UserType.CAREGIVER and user.patient:
-            target_user = user.patient
+        target_user_id = get_resolver(self.request).patient_id or user.id
         
         # Ensure only one safe zone per patient for now
-        SafeZone.objects.filter(user=target_user).delete()
-        serializer.save(user=target_user)
+        SafeZone.objects.filter(user_id=target_user_id).delete()
+        serializer.save(user_id=target_user_id)
+        geofence.invalidate_zone(target_user_id)
+
+def notify_zone_exit(patient, latitude, longitude):
+    """Send the emergency push alert to every caregiver linked to the patient"""
+    from ..notifications.push_service import send_emergency_alert
+
+    patient_name = f"{patient.first_name} {patient.last_name}".strip() or patient.username
+    for caregiver in caregivers_of(patient.id):
+        if not caregiver['push_token']:
+            continue
+        send_emergency_alert(
+            caregiver_token=caregiver['push_token'],
+            patient_name=patient_name,
+            latitude=float(latitude),
+            longitude=float(longitude)
+        )
 
 class LocationUpdateView(generics.CreateAPIView):
     serializer_class = LocationHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'location_update'
 
     def perform_create(self, serializer):
         # Only patients should update their location
         if self.request.user.user_type == User.UserType.PATIENT:
             patient = self.request.user
-            is_out_of_zone = self.request.data.get('is_out_of_zone', False)
-            
-            # Save location
-            location = serializer.save(user=patient)
-            
-            # Check if safe exit is active
-            safe_zone = SafeZone.objects.filter(user=patient).first()
-            safe_exit_active = safe_zone.safe_exit_active if safe_zone else False
-            
+            data = serializer.validated_data
+
+            # Containment is computed here; the client flag is only used without a zone
+            zone = geofence.get_zone(patient.id)
+            is_out_of_zone = geofence.evaluate(
+                zone,
+                [(float(data['latitude']), float(data['longitude']))],
+                [data.get('is_out_of_zone', False)]
+            )[0]
+            previous = geofence.get_state(patient.id)
+            transition = geofence.find_transitions(previous.is_out_of_zone, [is_out_of_zone]).get(0)
+
+            # Stationary ping: extend the previous row instead of inserting one
+            now = timezone.now()
+            merged = transition is None and dwell.can_merge(
+                previous, data['latitude'], data['longitude'], now.timestamp(), is_out_of_zone
+            ) and LocationHistory.objects.filter(
+                pk=previous.location_id, user=patient
+            ).update(ended_at=now, sample_count=F('sample_count') + 1, updated_at=now)
+
+            if merged:
+                location = LocationHistory.objects.get(pk=previous.location_id)
+                serializer.instance = location
+            else:
+                # Save location
+                location = serializer.save(user=patient, is_out_of_zone=is_out_of_zone)
+            # Merged pings are published too (with the extended row) so live views keep updating
+            transaction.on_commit(lambda: streaming.publish_location(location, transition))
+            geofence.set_state(patient.id, location)
+
             # 🚨 EMERGENCY ALERT: If just exited zone AND safe exit is NOT active
-            if is_out_of_zone and not safe_exit_active:
-                # Get previous location to check if this is a NEW exit
-                prev_locations = LocationHistory.objects.filter(
-                    user=patient
-                ).order_by('-timestamp')[1:2]  # Get second most recent
-                
-                # Only alert if previously was inside (or first location)
-                should_alert = not prev_locations or not prev_locations[0].is_out_of_zone
-                
-                if should_alert:
-                    # Find caregiver
-                    caregivers = User.objects.filter(
-                        user_type=User.UserType.CAREGIVER,
-                        patient=patient
-                    )
-                    
-                    for caregiver in caregivers:
-                        if caregiver.push_token:
-                            # Send emergency notification
-                            from ..notifications.push_service import send_emergency_alert
-                            patient_name = f"{patient.first_name} {patient.last_name}".strip() or patient.username
-                            
-                            send_emergency_alert(
-                                caregiver_token=caregiver.push_token,
-                                patient_name=patient_name,
-                                latitude=float(location.latitude),
-                                longitude=float(location.longitude)
-                            )
+            safe_exit_active = zone.safe_exit_active if zone else False
+            if transition == geofence.ZONE_EXIT and not safe_exit_active:
+                notify_zone_exit(patient, location.latitude, location.longitude)
+
+class LocationBatchUpdateView(APIView):
+    """Store a batch of points replayed from the offline queue in a single insert"""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'location_batch'
+
+    def post(self, request):
+        patient = request.user
+        if patient.user_type != User.UserType.PATIENT:
+            return Response(
+                {"error": "Only patients can upload locations"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = LocationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Order by device time; points without a client timestamp count as "now"
+        now = timezone.now()
+        locations = sorted(
+            (
+                LocationHistory(
+                    user=patient,
+                    latitude=point['latitude'],
+                    longitude=point['longitude'],
+                    timestamp=min(point.get('recorded_at') or now, now),
+                    is_out_of_zone=point['is_out_of_zone']
+                )
+                for point in serializer.validated_data['points']
+            ),
+            key=lambda location: location.timestamp
+        )
+
+        zone = geofence.get_zone(patient.id)
+        flags = geofence.evaluate(
+            zone,
+            [(float(location.latitude), float(location.longitude)) for location in locations],
+            [location.is_out_of_zone for location in locations]
+        )
+        for location, is_out_of_zone in zip(locations, flags):
+            location.is_out_of_zone = is_out_of_zone
+
+        # State right before the batch, so a batch that starts outside is not a new exit
+        previous = geofence.get_state(patient.id, before=locations[0].timestamp)
+
+        # One alert per exit episode (inside -> outside transition) in the batch
+        transitions = geofence.find_transitions(previous.is_out_of_zone, flags)
+        exits = [
+            locations[index] for index, transition in transitions.items()
+            if transition == geofence.ZONE_EXIT
+        ]
+
+        # Stationary runs collapse into dwell rows; transitions always start a new row
+        stored = dwell.merge_batch(locations)
+        LocationHistory.objects.bulk_create(stored)
+        geofence.set_state(patient.id, stored[-1])
+
+        # Live subscribers get the transitions and the newest row, not the whole replay
+        published = [(locations[index], transition) for index, transition in sorted(transitions.items())]
+        if not published or published[-1][0] is not stored[-1]:
+            published.append((stored[-1], None))
+
+        def publish():
+            for location, transition in published:
+                streaming.publish_location(location, transition)
+        transaction.on_commit(publish)
+
+        if zone and zone.safe_exit_active:
+            exits = []
+
+        for location in exits:
+            notify_zone_exit(patient, location.latitude, location.longitude)
+
+        return Response({
+            "received": len(locations),
+            "created": len(stored),
+            "alerts": len(exits)
+        }, status=status.HTTP_201_CREATED)
 
 class LocationHistoryView(generics.ListAPIView):
+    """
+    Latest points of the patient.
+
+    With ``?since=<cursor>`` only points written after the cursor are
+    returned, as ``{"results": [...], "next_cursor": ...}``; an empty
+    ``since`` starts a new cursor. Responses carry an ETag and answer
+    ``If-None-Match`` with 304 when nothing changed.
+
+    Cursors are ``<updated_at>|<location_id>`` keysets, so pages cut in
+    the middle of a timestamp resume where they stopped. They never point
+    later than ``since_overlap`` ago: writes that commit late with an
+    earlier updated_at are picked up by the next poll, at the cost of
+    returning recent points again (clients replace points by location_id).
+    """
     serializer_class = LocationHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    max_points = 100
+    max_since_points = 500
+    since_overlap = timedelta(seconds=5)
+
+    def get_target_user_id(self):
+        return get_resolver(self.request).patient_id
 
     def get_queryset(self):
-        user = self.request.user
-        if user.user_type == User.UserType.PATIENT:
-            return LocationHistory.objects.filter(user=user)[:100] # Limit to last 100 points
-        elif user.user_type == User.UserType.CAREGIVER and user.patient:
-            return LocationHistory.objects.filter(user=user.patient)[:100]
-        return LocationHistory.objects.none()
+        target_user_id = self.get_target_user_id()
+        if target_user_id is None:
+            return LocationHistory.objects.none()
+        return LocationHistory.objects.filter(user_id=target_user_id)[:self.max_points] # Limit to last 100 points
+
+    def parse_cursor(self, since, target_user_id):
+        """
+        (updated_at, location_id or None) from a cursor: a keyset, an ISO
+        timestamp or the location_id of a known point
+        """
+        moment, _, location_id = since.partition('|')
+        if location_id:
+            moment = parse_datetime(moment)
+            try:
+                location_id = uuid.UUID(location_id)
+            except ValueError:
+                moment = None
+            if moment is None:
+                raise ValidationError({"since": "Malformed cursor"})
+            return (moment if timezone.is_aware(moment) else timezone.make_aware(moment)), location_id
+
+        moment = parse_datetime(since)
+        if moment is not None:
+            return (moment if timezone.is_aware(moment) else timezone.make_aware(moment)), None
+        try:
+            location_id = uuid.UUID(since)
+        except ValueError:
+            raise ValidationError({"since": "Must be an ISO timestamp or a location_id"})
+        updated_at = LocationHistory.objects.filter(
+            user_id=target_user_id, location_id=location_id
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise ValidationError({"since": "Unknown location_id"})
+        return updated_at, location_id
+
+    def next_cursor(self, updated_at, location_id=None):
+        """Keyset after (updated_at, location_id), held back by since_overlap"""
+        settled = timezone.now() - self.since_overlap
+        if updated_at > settled:
+            # Without an id the cursor includes every point written at that time
+            updated_at, location_id = settled, None
+        return f"{updated_at.isoformat()}|{location_id}" if location_id else updated_at.isoformat()
+
+    def list(self, request, *args, **kwargs):
+        target_user_id = self.get_target_user_id()
+        since = request.query_params.get('since')
+        if target_user_id is None:
+            return super().list(request, *args, **kwargs) if since is None else Response(
+                {"results": [], "next_cursor": None}
+            )
+
+        # Cheap change marker: the newest write for this patient
+        latest = LocationHistory.objects.filter(user_id=target_user_id).order_by(
+            '-updated_at'
+        ).values_list('updated_at', flat=True).first()
+        marker = f"{target_user_id}:{latest.isoformat() if latest else ''}:{since}"
+        etag = f'"{hashlib.md5(marker.encode()).hexdigest()}"'
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        if since is None:
+            response = super().list(request, *args, **kwargs)
+        elif since:
+            updated_at, location_id = self.parse_cursor(since, target_user_id)
+            after = (
+                Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, location_id__gt=location_id)
+                if location_id else Q(updated_at__gte=updated_at)
+            )
+            points = list(
+                LocationHistory.objects.filter(after, user_id=target_user_id)
+                .order_by('updated_at', 'location_id')[:self.max_since_points]
+            )
+            next_cursor = (
+                self.next_cursor(points[-1].updated_at, points[-1].location_id) if points
+                else self.next_cursor(updated_at, location_id)
+            )
+            points.sort(key=lambda point: point.timestamp, reverse=True)
+            response = Response({
+                "results": self.get_serializer(points, many=True).data,
+                "next_cursor": next_cursor
+            })
+        else:
+            points = self.get_queryset()
+            response = Response({
+                "results": self.get_serializer(points, many=True).data,
+                "next_cursor": self.next_cursor(latest) if latest else None
+            })
+
+        response['ETag'] = etag
+        return response
+
+class LocationTrackView(APIView):
+    """
+    Simplified route of the patient over a time window.
+
+    Query params: ``start`` and ``end`` (ISO timestamps, default the last
+    24 hours) and ``points`` (target point budget).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_points = 500
+    max_points = 2000
+    max_window = timedelta(days=31)
+
+    def get(self, request):
+        patient_id = get_resolver(request).patient_id
+        if patient_id is None:
+            return Response(
+                {"error": "No patient associated with this account"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Default end is rounded up to the minute so repeated polls share a cache entry
+        end = self.parse_time('end') or (
+            timezone.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+        )
+        start = self.parse_time('start') or end - timedelta(days=1)
+        if start >= end:
+            raise ValidationError({"start": "Must be before end"})
+        if end - start > self.max_window:
+            raise ValidationError({"start": "The window cannot exceed 31 days"})
+
+        try:
+            budget = int(request.query_params.get('points', self.default_points))
+        except ValueError:
+            raise ValidationError({"points": "Must be an integer"})
+        budget = min(max(budget, 2), self.max_points)
+
+        track = tracks.get_simplified_track(patient_id, start, end, budget)
+        return Response({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            **track
+        }, status=status.HTTP_200_OK)
+
+    def parse_time(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValidationError({name: "Must be an ISO timestamp"})
+        return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+class LocationStreamView(View):
+    """
+    Server-Sent Events feed of the patient's new points and zone transitions.
+
+    Patients receive their own feed, caregivers the feed of their linked
+    patient. Needs the ASGI application (core.asgi); streams are closed
+    after ``max_seconds`` so the client reconnects and is re-authorized.
+    """
+    heartbeat_seconds = 15
+    max_seconds = 300
+
+    async def get(self, request):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided or are invalid."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        patient_id = target_patient_id(user)
+        if patient_id is None:
+            return JsonResponse(
+                {"error": "No patient associated with this account"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return StreamingHttpResponse(
+            self.stream(patient_id),
+            content_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    def authenticate(self, request):
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        return result[0] if result else None
+
+    async def stream(self, patient_id):
+        subscription = streaming.get_broker().subscribe(streaming.patient_channel(patient_id))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_seconds
+        try:
+            yield "retry: 5000\n\n"
+            while loop.time() < deadline:
+                message = await subscription.get_message(timeout=self.heartbeat_seconds)
+                yield message or ": keepalive\n\n"
+        finally:
+            subscription.unsubscribe()
 
 class SafeExitToggleView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request):
         """Toggle safe exit mode for the patient's safe zone"""
-        user = request.user
-        
         # Determine target user (patient)
-        if user.user_type == User.UserType.CAREGIVER and user.patient:
-            target_user = user.patient
-        elif user.user_type == User.UserType.PATIENT:
-            target_user = user
-        else:
+        target_user_id = get_resolver(request).patient_id
+        if target_user_id is None:
             return Response(
                 {"error": "No patient associated with this account"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Get safe zone
-        safe_zone = SafeZone.objects.filter(user=target_user).first()
+        safe_zone = SafeZone.objects.filter(user_id=target_user_id).first()
         if not safe_zone:
             return Response(
                 {"error": "No safe zone configured"},
@@ -122,6 +429,7 @@ class SafeExitToggleView(APIView):
             safe_zone.safe_exit_active = not safe_zone.safe_exit_active
         
         safe_zone.save()
+        geofence.invalidate_zone(target_user_id)
         
         return Response({
             "safe_exit_active": safe_zone.safe_exit_active,
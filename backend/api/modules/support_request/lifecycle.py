@@ -0,0 +1,133 @@
+"""
+Scheduled status transitions for support requests.
+
+Requests whose window has ended are closed in batches found through the
+(status, end_datetime) index:
+
+- Asignada / En curso -> Finalizada, and the caregiver's temporary patient
+  assignment is released
+- En espera -> Cancelada, since nobody took it in time
+
+Each batch is one transaction: rows are locked with skip_locked so several
+schedulers can run side by side, and the push notifications are written to
+the outbox in the same transaction.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..matching.models import CaregiverAvailability
+from ..matching.services import refresh_load
+from ..notifications.push_service import enqueue_push_notification, is_valid_token
+from ..user.models import User
+from ..user.authentication import bump_user_version
+from ..user.relationships import invalidate_patient
+from .models import SupportRequest
+
+
+BATCH_SIZE = 200
+
+TRANSITIONS = {
+    SupportRequest.Status.ASIGNADA: SupportRequest.Status.FINALIZADA,
+    SupportRequest.Status.EN_CURSO: SupportRequest.Status.FINALIZADA,
+    SupportRequest.Status.EN_ESPERA: SupportRequest.Status.CANCELADA,
+}
+
+
+def _notify(user, title, body, support_request):
+    if user is not None and is_valid_token(user.push_token):
+        enqueue_push_notification(
+            push_token=user.push_token,
+            title=title,
+            body=body,
+            data={
+                "type": "support_request_status",
+                "support_request_id": str(support_request.pk),
+                "status": support_request.status,
+            },
+            priority="default"
+        )
+
+
+def notify_parties(support_request):
+    if support_request.status == SupportRequest.Status.FINALIZADA:
+        body = f'El apoyo "{support_request.reason}" terminó y fue finalizado automáticamente.'
+        _notify(support_request.requester, 'Solicitud de apoyo finalizada', body, support_request)
+        _notify(support_request.assigned_caregiver, 'Solicitud de apoyo finalizada', body, support_request)
+    else:
+        _notify(
+            support_request.requester,
+            'Solicitud de apoyo cancelada',
+            f'Nadie tomó la solicitud "{support_request.reason}" antes de su término.',
+            support_request
+        )
+
+
+def close_batch(now=None, batch_size=BATCH_SIZE) -> int:
+    """
+    Close one batch of expired requests
+
+    Returns:
+        int: Number of requests closed
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            SupportRequest.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('requester', 'assigned_caregiver')
+            .filter(status__in=TRANSITIONS.keys(), end_datetime__lte=now)
+            .order_by('end_datetime')[:batch_size]
+        )
+        if not batch:
+            return 0
+
+        for status in set(TRANSITIONS.values()):
+            ids = [request.pk for request in batch if TRANSITIONS[request.status] == status]
+            if not ids:
+                continue
+            changes = {'status': status, 'updated_at': now}
+            if status == SupportRequest.Status.FINALIZADA:
+                changes['actual_end'] = Coalesce('actual_end', 'end_datetime')
+            SupportRequest.objects.filter(pk__in=ids).update(**changes)
+
+        # Release only caregivers still holding the patient of the request
+        finished = [
+            request for request in batch
+            if TRANSITIONS[request.status] == SupportRequest.Status.FINALIZADA and request.assigned_caregiver_id
+        ]
+        holding = [
+            Q(pk=request.assigned_caregiver_id, patient_id=request.patient_id)
+            for request in finished if request.patient_id
+        ]
+        released = []
+        if holding:
+            released = list(User.objects.filter(reduce(or_, holding)).values_list('pk', flat=True))
+            User.objects.filter(pk__in=released).update(patient=None)
+            CaregiverAvailability.objects.filter(caregiver_id__in=released).update(is_available=True, updated_at=now)
+        refresh_load({request.assigned_caregiver_id for request in finished})
+        # Bulk updates skip the User signals
+        patient_ids = [request.patient_id for request in finished if request.assigned_caregiver_id in released]
+        transaction.on_commit(lambda: invalidate_patient(*patient_ids))
+        transaction.on_commit(lambda: bump_user_version(*released))
+
+        for request in batch:
+            request.status = TRANSITIONS[request.status]
+            notify_parties(request)
+
+    print(f"🗓️ Closed {len(batch)} expired support requests, released {len(released)} caregivers")
+    return len(batch)
+
+
+def close_expired(now=None, batch_size=BATCH_SIZE) -> int:
+    """Close every request that is due at ``now``, batch by batch"""
+    now = now or timezone.now()
+    total = 0
+    while True:
+        closed = close_batch(now, batch_size)
+        total += closed
+        if closed < batch_size:
+            return total
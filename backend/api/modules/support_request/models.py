@@ -56,6 +56,13 @@ class SupportRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Overlap checks: one person's windows by start, end read from the index
+            models.Index(fields=['requester', 'start_datetime', 'end_datetime'], name='support_requester_window_idx'),
+            models.Index(fields=['assigned_caregiver', 'start_datetime', 'end_datetime'], name='support_caregiver_window_idx'),
+            # Lifecycle scheduler: open requests whose window has ended
+            models.Index(fields=['status', 'end_datetime'], name='support_status_end_idx'),
+        ]
         verbose_name = 'Solicitud de Apoyo'
         verbose_name_plural = 'Solicitudes de Apoyo'
     
@@ -0,0 +1,113 @@
+"""
+Query planning for support requests.
+
+Every queryset that is serialized goes through ``with_people`` so the
+requester and assigned caregiver come from the same query (LEFT JOIN)
+instead of one query per row and relation. Only the user columns the
+serializers read are loaded.
+
+Listings can opt into keyset pagination: pages are ordered by
+(created_at, id) descending and a cursor is the last row's pair, so every
+page costs one query whatever its depth. The row count of the remaining
+set is computed in that same query with a window function.
+"""
+import base64
+import uuid
+
+from django.db import models
+from django.db.models import Count, Window
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import SupportRequest
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Columns read by RequesterSerializer / AssignedCaregiverSerializer and __str__
+PERSON_FIELDS = ('id', 'username', 'first_name', 'last_name', 'email', 'phone_number')
+
+
+def with_people(queryset):
+    own_fields = [field.attname for field in SupportRequest._meta.concrete_fields]
+    return queryset.select_related('requester', 'assigned_caregiver').only(
+        *own_fields,
+        *(f'requester__{field}' for field in PERSON_FIELDS),
+        *(f'assigned_caregiver__{field}' for field in PERSON_FIELDS),
+    )
+
+
+def for_user(user):
+    """Requests created by or assigned to ``user``"""
+    return with_people(SupportRequest.objects.filter(
+        models.Q(requester=user) | models.Q(assigned_caregiver=user)
+    ))
+
+
+def available_for(user):
+    """Unassigned waiting requests that ``user`` could take"""
+    return with_people(SupportRequest.objects.filter(
+        status=SupportRequest.Status.EN_ESPERA,
+        assigned_caregiver__isnull=True
+    ).exclude(requester=user))
+
+
+def encode_cursor(support_request):
+    raw = f"{support_request.created_at.isoformat()}|{support_request.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        moment = parse_datetime(created_at)
+        pk = uuid.UUID(pk)
+    except (ValueError, UnicodeDecodeError):
+        moment = None
+    if moment is None:
+        raise ValidationError({"cursor": "Cursor inválido."})
+    return moment, pk
+
+
+def page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except ValueError:
+        raise ValidationError({"limit": "Debe ser un número entero."})
+
+
+def keyset_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of ``queryset``, newest first
+
+    Returns:
+        tuple: (rows, next_cursor or None, rows remaining from this page on)
+    """
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            models.Q(created_at__lt=created_at) | models.Q(created_at=created_at, pk__lt=pk)
+        )
+    rows = list(
+        queryset.annotate(remaining=Window(Count('pk')))
+        .order_by('-created_at', '-pk')[:limit + 1]
+    )
+    remaining = rows[0].remaining if rows else 0
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor, remaining
+
+
+def is_paginated(request):
+    return 'cursor' in request.query_params or 'limit' in request.query_params
+
+
+def paginate(request, queryset):
+    """Keyset page selected by the ``cursor`` and ``limit`` query parameters"""
+    return keyset_page(
+        queryset,
+        request.query_params.get('cursor'),
+        page_size(request.query_params.get('limit'))
+    )
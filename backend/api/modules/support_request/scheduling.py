@@ -0,0 +1,50 @@
+"""
+Time-window conflicts between support requests.
+
+Two windows overlap when each starts before the other ends (half-open
+intervals, so back-to-back windows do not conflict). Lookups filter on
+(person, start_datetime, end_datetime) composite indexes, so a check reads
+one person's entries in a start range instead of scanning every request.
+
+A PostgreSQL exclusion constraint would need btree_gist and would not run
+on SQLite, which the project also supports; conflicts are checked here and
+under the assignment lock in matching.assign_caregiver instead.
+"""
+from .models import SupportRequest
+
+
+# Requests that still hold their window
+OPEN_STATUSES = (
+    SupportRequest.Status.EN_ESPERA,
+    SupportRequest.Status.ASIGNADA,
+    SupportRequest.Status.EN_CURSO,
+)
+# Requests that keep the assigned caregiver busy
+BUSY_STATUSES = (SupportRequest.Status.ASIGNADA, SupportRequest.Status.EN_CURSO)
+
+
+def overlapping(queryset, start, end):
+    return queryset.filter(start_datetime__lt=end, end_datetime__gt=start)
+
+
+def requester_conflicts(requester, start, end, exclude_id=None):
+    """Open requests of ``requester`` whose window overlaps [start, end)"""
+    conflicts = overlapping(
+        SupportRequest.objects.filter(requester=requester, status__in=OPEN_STATUSES), start, end
+    )
+    return conflicts.exclude(pk=exclude_id) if exclude_id else conflicts
+
+
+def caregiver_conflicts(caregiver_id, start, end, exclude_id=None):
+    """Assignments of the caregiver whose window overlaps [start, end)"""
+    conflicts = overlapping(
+        SupportRequest.objects.filter(assigned_caregiver_id=caregiver_id, status__in=BUSY_STATUSES), start, end
+    )
+    return conflicts.exclude(pk=exclude_id) if exclude_id else conflicts
+
+
+def busy_caregiver_ids(start, end):
+    """Subquery of caregivers with an assignment overlapping [start, end)"""
+    return overlapping(
+        SupportRequest.objects.filter(assigned_caregiver__isnull=False, status__in=BUSY_STATUSES), start, end
+    ).values('assigned_caregiver_id')
@@ -1,8 +1,20 @@
 from rest_framework import serializers
 from .models import SupportRequest
+from .scheduling import requester_conflicts
 from ..user.models import User
 
 
+def validate_window(requester, start, end, exclude_id=None):
+    if start >= end:
+        raise serializers.ValidationError({
+            'end_datetime': 'La fecha de fin debe ser posterior a la fecha de inicio.'
+        })
+    if requester is not None and requester_conflicts(requester, start, end, exclude_id).exists():
+        raise serializers.ValidationError({
+            'start_datetime': 'Ya tienes una solicitud de apoyo en ese horario.'
+        })
+
+
 class RequesterSerializer(serializers.ModelSerializer):
     """Serializer for requester basic info"""
     full_name = serializers.SerializerMethodField()
@@ -49,6 +61,14 @@ class SupportRequestSerializer(serializers.ModelSerializer):
             'actual_start', 'actual_end', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'requester', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        if self.instance is None or not ({'start_datetime', 'end_datetime'} & data.keys()):
+            return data
+        start = data.get('start_datetime', self.instance.start_datetime)
+        end = data.get('end_datetime', self.instance.end_datetime)
+        validate_window(self.instance.requester_id, start, end, exclude_id=self.instance.pk)
+        return data
 
 
 class CreateSupportRequestSerializer(serializers.ModelSerializer):
@@ -59,10 +79,10 @@ class CreateSupportRequestSerializer(serializers.ModelSerializer):
         fields = ['reason', 'start_datetime', 'end_datetime', 'notes']
     
     def validate(self, data):
-        if data['start_datetime'] >= data['end_datetime']:
-            raise serializers.ValidationError({
-                'end_datetime': 'La fecha de fin debe ser posterior a la fecha de inicio.'
-            })
+        request = self.context.get('request')
+        validate_window(
+            request.user if request else None, data['start_datetime'], data['end_datetime']
+        )
         return data
 
 
@@ -6,5 +6,6 @@ urlpatterns = [
     path('available/', views.GetAvailableSupportRequestsView.as_view(), name='support-request-available'),
     path('<uuid:pk>/', views.SupportRequestDetailView.as_view(), name='support-request-detail'),
     path('<uuid:pk>/assign/', views.AssignCaregiverView.as_view(), name='support-request-assign'),
+    path('<uuid:pk>/candidates/', views.SupportRequestCandidatesView.as_view(), name='support-request-candidates'),
     path('<uuid:pk>/update-status/', views.UpdateStatusView.as_view(), name='support-request-update-status'),
 ]
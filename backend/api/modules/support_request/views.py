@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import models
 from .models import SupportRequest
+from . import queries
 from .serializers import (
     SupportRequestSerializer,
     CreateSupportRequestSerializer,
@@ -11,21 +12,34 @@ from .serializers import (
     AssignCaregiverSerializer
 )
 from ..user.models import User
+from ..user.relationships import invalidate_patient
+from ..user_data.serializers import CaregiverSerializer
+from ..matching.services import AssignmentError, assign_caregiver, rank_candidates, zone_coordinates
 
 
 class SupportRequestListCreateView(generics.ListCreateAPIView):
     """
     GET: List all support requests for the authenticated user
+         With ``?limit=`` and/or ``?cursor=`` returns a keyset page:
+         {"results": [...], "next_cursor": ..., "count": rows from this page on}
     POST: Create a new support request
     """
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         # Return requests created by the user or assigned to the user
-        user = self.request.user
-        return SupportRequest.objects.filter(
-            models.Q(requester=user) | models.Q(assigned_caregiver=user)
-        )
+        return queries.for_user(self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        if not queries.is_paginated(request):
+            return super().list(request, *args, **kwargs)
+        rows, next_cursor, count = queries.paginate(request, self.get_queryset())
+        serializer = self.get_serializer(rows, many=True)
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+            'count': count
+        })
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -47,10 +61,7 @@ class SupportRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         # Users can only access their own requests or requests assigned to them
-        user = self.request.user
-        return SupportRequest.objects.filter(
-            models.Q(requester=user) | models.Q(assigned_caregiver=user)
-        )
+        return queries.for_user(self.request.user)
 
 
 class AssignCaregiverView(APIView):
@@ -63,66 +74,19 @@ class AssignCaregiverView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request, pk):
-        try:
-            # Allow access if user is the requester OR if taking the request for themselves
-            support_request = SupportRequest.objects.get(pk=pk)
-            
-            # Check if user is trying to assign themselves
-            caregiver_id = request.data.get('caregiver_id')
-            is_self_assignment = (caregiver_id == request.user.id)
-            
-            # Only requester can assign others, anyone can assign themselves
-            if not is_self_assignment and support_request.requester != request.user:
-                return Response({
-                    'error': 'Solo el solicitante puede asignar a otro cuidador.'
-                }, status=status.HTTP_403_FORBIDDEN)
-                
-        except SupportRequest.DoesNotExist:
-            return Response({
-                'error': 'Solicitud no encontrada.'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
         serializer = AssignCaregiverSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         caregiver_id = serializer.validated_data['caregiver_id']
         
+        # Locks the request and the caregiver so concurrent claims cannot both succeed
         try:
-            caregiver = User.objects.get(id=caregiver_id, user_type=User.UserType.CAREGIVER)
-        except User.DoesNotExist:
-            return Response({
-                'error': 'Cuidador no encontrado.'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        # Check if caregiver is available (no patient assigned)
-        if caregiver.patient is not None:
-            return Response({
-                'error': 'Este cuidador ya tiene un paciente asignado.'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Assign caregiver to the support request
-        support_request.assigned_caregiver = caregiver
-        
-        # Get the requester's patient
-        requester_patient = support_request.requester.patient
-        print(f"🔍 DEBUG - Requester: {support_request.requester.username}")
-        print(f"🔍 DEBUG - Requester patient: {requester_patient}")
-        
-        if requester_patient:
-            # Save patient reference in the support request
-            support_request.patient = requester_patient
-            
-            # Temporarily assign the patient to the caregiver
-            caregiver.patient = requester_patient
-            caregiver.save()
-            print(f"✅ DEBUG - Patient {requester_patient.username} assigned to {caregiver.username}")
-        else:
-            print(f"⚠️ DEBUG - Requester has no patient assigned!")
-        
-        support_request.status = SupportRequest.Status.ASIGNADA
-        support_request.save()
+            support_request = assign_caregiver(pk, caregiver_id, request.user)
+        except AssignmentError as e:
+            return Response({'error': e.message}, status=e.status_code)
         
+        caregiver = support_request.assigned_caregiver
         response_serializer = SupportRequestSerializer(support_request, context={'request': request})
         return Response({
             'message': f'Cuidador {caregiver.first_name} {caregiver.last_name} asignado exitosamente.',
@@ -130,6 +94,36 @@ class AssignCaregiverView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class SupportRequestCandidatesView(APIView):
+    """
+    GET: Caregivers free during a support request's window, least loaded
+    and nearest to the patient's safe zone first
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        support_request = SupportRequest.objects.select_related('requester').filter(
+            pk=pk, requester=request.user
+        ).first()
+        if support_request is None:
+            return Response({
+                'error': 'Solicitud no encontrada.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        patient_id = support_request.patient_id or support_request.requester.patient_id
+        caregivers = rank_candidates(
+            zone_coordinates(patient_id),
+            exclude_ids=[request.user.id],
+            window=(support_request.start_datetime, support_request.end_datetime)
+        )
+        serializer = CaregiverSerializer(caregivers, many=True, context={'request': request})
+        
+        return Response({
+            'caregivers': serializer.data,
+            'count': len(caregivers)
+        }, status=status.HTTP_200_OK)
+
+
 class UpdateStatusView(APIView):
     """
     POST: Update the status of a support request
@@ -138,7 +132,9 @@ class UpdateStatusView(APIView):
     
     def post(self, request, pk):
         try:
-            support_request = SupportRequest.objects.get(
+            support_request = SupportRequest.objects.select_related(
+                'requester', 'assigned_caregiver', 'patient'
+            ).get(
                 models.Q(pk=pk) & 
                 (models.Q(requester=request.user) | models.Q(assigned_caregiver=request.user))
             )
@@ -166,6 +162,7 @@ class UpdateStatusView(APIView):
                 print(f"🔍 DEBUG - Unassigning patient {support_request.patient.username} from {support_request.assigned_caregiver.username}")
                 support_request.assigned_caregiver.patient = None
                 support_request.assigned_caregiver.save()
+                invalidate_patient(support_request.patient_id)
                 print(f"✅ DEBUG - Patient unassigned successfully")
         elif new_status == SupportRequest.Status.CANCELADA:
             # Also unassign patient if request is cancelled
@@ -173,6 +170,7 @@ class UpdateStatusView(APIView):
                 print(f"🔍 DEBUG - Unassigning patient (cancelled) {support_request.patient.username} from {support_request.assigned_caregiver.username}")
                 support_request.assigned_caregiver.patient = None
                 support_request.assigned_caregiver.save()
+                invalidate_patient(support_request.patient_id)
                 print(f"✅ DEBUG - Patient unassigned successfully (cancelled)")
         
         support_request.status = new_status
@@ -189,19 +187,27 @@ class GetAvailableSupportRequestsView(APIView):
     """
     GET: Get all available support requests (status = En espera, not assigned)
     These are requests that caregivers can take
+    With ``?limit=`` and/or ``?cursor=`` returns a keyset page and a next_cursor
     """
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         # Get all support requests that are in "En espera" status and not created by current user
-        available_requests = SupportRequest.objects.filter(
-            status=SupportRequest.Status.EN_ESPERA,
-            assigned_caregiver__isnull=True
-        ).exclude(requester=request.user)
+        available_requests = queries.available_for(request.user)
+        
+        extra = {}
+        if queries.is_paginated(request):
+            rows, next_cursor, count = queries.paginate(request, available_requests)
+            extra['next_cursor'] = next_cursor
+        else:
+            # Count the fetched rows instead of issuing a second COUNT query
+            rows = list(available_requests)
+            count = len(rows)
         
-        serializer = SupportRequestSerializer(available_requests, many=True, context={'request': request})
+        serializer = SupportRequestSerializer(rows, many=True, context={'request': request})
         
         return Response({
             'requests': serializer.data,
-            'count': available_requests.count()
+            'count': count,
+            **extra
         }, status=status.HTTP_200_OK)
@@ -0,0 +1,80 @@
+"""
+Token-bucket rate limiting for DRF views.
+
+Each (scope, user) pair owns a bucket of CAPACITY tokens refilled at
+REFILL_PER_SECOND; a request takes one token or is rejected with 429 and a
+Retry-After of the time until the next token. Buckets live in the Django
+cache (local memory by default, Redis when REDIS_URL is set), as
+(tokens, updated_at) under ``throttle:<scope>:<ident>``. Updates are
+serialized per process; across processes two concurrent requests may both
+read the same bucket, so a burst can exceed the capacity by at most one
+token per process.
+
+Limits are configured per scope in ``settings.RATE_LIMITS``; a view opts in
+with ``throttle_classes = [TokenBucketThrottle]`` and ``throttle_scope``.
+Scopes missing from the settings are not limited.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+_lock = threading.Lock()
+
+
+def get_limits(scope):
+    return getattr(settings, 'RATE_LIMITS', {}).get(scope)
+
+
+def take_token(key, capacity, refill_per_second, now=None):
+    """
+    Take one token from the bucket at ``key``
+
+    Returns:
+        float: 0 if a token was taken, otherwise seconds until one is available
+    """
+    now = time.time() if now is None else now
+    # Long enough for an empty bucket to refill; an expired key is a full bucket
+    timeout = max(int(capacity / refill_per_second) + 1, 1)
+    with _lock:
+        tokens, updated_at = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(now - updated_at, 0) * refill_per_second)
+        if tokens < 1:
+            cache.set(key, (tokens, now), timeout)
+            return (1 - tokens) / refill_per_second
+        cache.set(key, (tokens - 1, now), timeout)
+        return 0.0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        scope = getattr(view, self.scope_attr, None)
+        limits = get_limits(scope) if scope else None
+        if not limits:
+            return True
+
+        wait = take_token(
+            f'throttle:{scope}:{self.get_ident_key(request)}',
+            limits['CAPACITY'],
+            limits['REFILL_PER_SECOND']
+        )
+        if wait:
+            self.retry_after = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,69 @@
+"""
+JWT authentication without a User query per request.
+
+Users are cached for USER_CACHE_TIMEOUT seconds under
+``auth:user:<id>:<version>``. The version is bumped whenever the user row
+is saved or deleted (signals in user/models.py), so a changed user is never
+served from the cache; bulk ``update()`` calls on User must call
+``bump_user_version`` themselves.
+"""
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+USER_CACHE_TIMEOUT = 60
+# Outlives every cached user, so a lost version can only point at expired entries
+VERSION_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _version_key(user_id):
+    return f'auth:user_version:{user_id}'
+
+
+def bump_user_version(*user_ids):
+    for user_id in user_ids:
+        key = _version_key(user_id)
+        cache.add(key, 0, VERSION_CACHE_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, 1, VERSION_CACHE_TIMEOUT)
+
+
+def get_cached_user(user_id):
+    """
+    Raises:
+        User.DoesNotExist
+    """
+    version = cache.get(_version_key(user_id), 0)
+    key = f'auth:user:{user_id}:{version}'
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        cache.set(key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken("Token contained no recognizable user identification") from e
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed("User not found", code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Password checks are left to the stock implementation
+            return super().get_user(validated_token)
+        return user
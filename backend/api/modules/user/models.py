@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import AbstractUser
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
     
 class User(AbstractUser):
     class UserType(models.TextChoices):
@@ -22,6 +24,8 @@ class User(AbstractUser):
     phone_number = models.CharField(max_length=255, null=True)
     patient = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='caregivers')
     profile_picture = models.ImageField(upload_to="profile_pictures/", null=True, blank=True)
+    # Normalized sizes of profile_picture as media blobs (see media/avatars.py)
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     age = models.PositiveIntegerField(null=True, blank=True)
     gender = models.CharField(max_length=10, choices=GenderChoices.choices, null=True, blank=True)
     alzheimer_level = models.CharField(max_length=10, choices=alzheimerLevelChoices.choices, null=True, blank=True)
@@ -45,3 +49,28 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_caregiver_relationships(sender, instance, **kwargs):
+    # The patient this caregiver is linked to now; the previous one is
+    # invalidated by whoever moved the caregiver (see user/relationships.py)
+    if instance.user_type == User.UserType.CAREGIVER and instance.patient_id:
+        from .relationships import invalidate_patient
+        invalidate_patient(instance.patient_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    from .authentication import bump_user_version
+    bump_user_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def release_profile_picture(sender, instance, **kwargs):
+    from ..media.avatars import avatar_names, discard_avatar
+    names = avatar_names(instance)
+    if names:
+        transaction.on_commit(lambda: discard_avatar(*names))
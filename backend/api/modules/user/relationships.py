@@ -0,0 +1,85 @@
+"""
+Patient <-> caregiver relationships.
+
+``target_patient_id`` answers "whose data does this user see" from the
+user row itself (patients see their own, caregivers their patient's), so it
+never loads the patient. The caregivers of a patient are cached in the
+Django cache and memoized per request by ``get_resolver``.
+
+The cache is dropped when a caregiver row is saved or deleted (signals in
+user/models.py). Code that moves a caregiver away from a patient, or
+updates users in bulk, must also call ``invalidate_patient`` for the
+patient that was left.
+"""
+from typing import List, Optional
+
+from django.core.cache import cache
+
+from .models import User
+
+
+CAREGIVERS_CACHE_TIMEOUT = 30 * 60
+
+CAREGIVER_FIELDS = ('id', 'first_name', 'last_name', 'email', 'phone_number', 'push_token')
+
+
+def _caregivers_key(patient_id):
+    return f'relationships:caregivers:{patient_id}'
+
+
+def target_patient_id(user) -> Optional[int]:
+    """The patient whose data ``user`` works with, or None"""
+    if user.user_type == User.UserType.PATIENT:
+        return user.id
+    if user.user_type == User.UserType.CAREGIVER:
+        return user.patient_id
+    return None
+
+
+def caregivers_of(patient_id) -> List[dict]:
+    """Caregivers linked to the patient, oldest link first (the main caregiver)"""
+    if patient_id is None:
+        return []
+    caregivers = cache.get(_caregivers_key(patient_id))
+    if caregivers is None:
+        caregivers = list(
+            User.objects.filter(user_type=User.UserType.CAREGIVER, patient_id=patient_id)
+            .order_by('id').values(*CAREGIVER_FIELDS)
+        )
+        cache.set(_caregivers_key(patient_id), caregivers, CAREGIVERS_CACHE_TIMEOUT)
+    return caregivers
+
+
+def main_caregiver(patient_id) -> Optional[dict]:
+    caregivers = caregivers_of(patient_id)
+    return caregivers[0] if caregivers else None
+
+
+def invalidate_patient(*patient_ids):
+    cache.delete_many([_caregivers_key(patient_id) for patient_id in patient_ids if patient_id])
+
+
+class RelationshipResolver:
+    """Per-request view of the relationships of ``request.user``"""
+
+    def __init__(self, user):
+        self.user = user
+        self._caregivers = {}
+
+    @property
+    def patient_id(self) -> Optional[int]:
+        return target_patient_id(self.user)
+
+    def caregivers(self, patient_id=None) -> List[dict]:
+        patient_id = patient_id or self.patient_id
+        if patient_id not in self._caregivers:
+            self._caregivers[patient_id] = caregivers_of(patient_id)
+        return self._caregivers[patient_id]
+
+
+def get_resolver(request) -> RelationshipResolver:
+    resolver = getattr(request, '_relationships', None)
+    if resolver is None or resolver.user is not request.user:
+        resolver = RelationshipResolver(request.user)
+        request._relationships = resolver
+    return resolver
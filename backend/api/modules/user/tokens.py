@@ -0,0 +1,189 @@
+"""
+Refresh token rotation with a cheap blacklist check.
+
+Every refresh has to prove the presented token is not blacklisted. Each
+process keeps a Bloom filter of blacklisted jtis, loaded incrementally from
+BlacklistedToken every SYNC_SECONDS; a negative answer from the filter is
+trusted, a positive one is confirmed against the database. Tokens
+blacklisted by another process since the last sync are caught by a short
+lived ``auth:blacklisted:<jti>`` cache entry. That only works when the
+cache is shared between processes (Redis), so with a per-process cache
+every refresh falls back to the stock database check.
+
+The filter is sized for twice the live blacklist (at least CAPACITY) and
+rebuilt, at most every SYNC_SECONDS, once it outgrows that.
+
+Blacklisting and outstanding-token bookkeeping insert rows directly
+instead of the stock get_or_create round trips, and the user is read
+through the authentication cache.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .authentication import get_cached_user
+from .models import User
+
+
+DEFAULT_BLOOM = {
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.01,
+    'SYNC_SECONDS': 30,
+}
+
+
+def get_bloom_settings():
+    return {**DEFAULT_BLOOM, **getattr(settings, 'AUTH_BLACKLIST_BLOOM', {})}
+
+
+def shared_cache() -> bool:
+    """Whether cache entries set by one process are seen by the others"""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def _recent_key(jti):
+    return f'auth:blacklisted:{jti}'
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistIndex:
+    """Process-wide Bloom filter over BlacklistedToken, synced by id"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._synced_at = 0.0
+
+    def _rebuild(self, config):
+        # Expired tokens cannot be refreshed anyway, so only live ones are loaded
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        # Headroom for the tokens blacklisted until the next rebuild
+        capacity = max(config['CAPACITY'], 2 * rows.count())
+        self._filter = BloomFilter(capacity, config['ERROR_RATE'])
+        self._last_id = 0
+        self._load(rows)
+
+    def _load(self, rows):
+        for row_id, jti in rows.order_by('id').values_list('id', 'token__jti').iterator(chunk_size=5000):
+            self._filter.add(jti)
+            self._last_id = max(self._last_id, row_id)
+
+    def _sync(self):
+        config = get_bloom_settings()
+        if self._filter is not None and time.monotonic() - self._synced_at < config['SYNC_SECONDS']:
+            return
+        if self._filter is None or self._filter.count > self._filter.capacity:
+            self._rebuild(config)
+        else:
+            self._load(BlacklistedToken.objects.filter(id__gt=self._last_id))
+        self._synced_at = time.monotonic()
+
+    def might_contain(self, jti):
+        with self._lock:
+            self._sync()
+            return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        cache.set(_recent_key(jti), True, get_bloom_settings()['SYNC_SECONDS'] * 2)
+
+
+blacklist_index = BlacklistIndex()
+
+
+class FastRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        # Without a shared cache, tokens just blacklisted by other processes would go unseen
+        if shared_cache() and not blacklist_index.might_contain(jti) and not cache.get(_recent_key(jti)):
+            return
+        super().check_blacklist()
+
+    def _outstanding_values(self):
+        return {
+            'user_id': self.payload.get(api_settings.USER_ID_CLAIM),
+            'created_at': self.current_time,
+            'token': str(self),
+            'expires_at': datetime_from_epoch(self.payload['exp']),
+        }
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token_id = OutstandingToken.objects.filter(jti=jti).values_list('id', flat=True).first()
+        if token_id is None:
+            token_id = OutstandingToken.objects.create(jti=jti, **self._outstanding_values()).id
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token_id=token_id)], ignore_conflicts=True)
+        blacklist_index.add(jti)
+
+    def outstand(self):
+        # Called right after set_jti(), so the jti is always new
+        return OutstandingToken.objects.create(jti=self.payload[api_settings.JTI_CLAIM], **self._outstanding_values())
+
+
+class FastTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FastRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            try:
+                user = get_cached_user(user_id)
+            except User.DoesNotExist:
+                user = None
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data['refresh'] = str(refresh)
+
+        return data
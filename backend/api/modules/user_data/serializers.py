@@ -1,5 +1,7 @@
 from rest_framework import serializers
+from ..media.avatars import avatar_urls
 from ..user.models import User
+from ..user.relationships import main_caregiver
 
 
 class ProfilePictureSerializer(serializers.Serializer):
@@ -20,6 +22,7 @@ class ProfilePictureSerializer(serializers.Serializer):
 class UserDataSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     main_caregiver = serializers.SerializerMethodField()
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -34,24 +37,29 @@ class UserDataSerializer(serializers.ModelSerializer):
             'age',
             'alzheimer_level',
             'profile_picture',
+            'profile_picture_variants',
             'main_caregiver',
             'patient',
             'created_at',
         )
-        read_only_fields = ('id', 'created_at')
+        # The picture is changed through UploadProfilePictureView, which keeps blob references
+        read_only_fields = ('id', 'created_at', 'profile_picture')
 
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip() or "Sin nombre"
 
+    def get_profile_picture_variants(self, obj):
+        return avatar_urls(obj, self.context.get('request'))
+
     def get_main_caregiver(self, obj):
         if obj.user_type == User.UserType.PATIENT:
-            caregiver = obj.caregivers.first()
+            caregiver = main_caregiver(obj.id)
             if caregiver:
                 return {
-                    "id": caregiver.id,
-                    "full_name": f"{caregiver.first_name} {caregiver.last_name}".strip() or "Sin nombre",
-                    "email": caregiver.email,
-                    "phone_number": caregiver.phone_number or "No registrado",
+                    "id": caregiver["id"],
+                    "full_name": f"{caregiver['first_name']} {caregiver['last_name']}".strip() or "Sin nombre",
+                    "email": caregiver["email"],
+                    "phone_number": caregiver["phone_number"] or "No registrado",
                 }
         return None
 
@@ -60,12 +68,14 @@ class PatientInfoSerializer(serializers.ModelSerializer):
     """Serializer for patient information to be shared via QR code"""
     full_name = serializers.SerializerMethodField()
     profile_picture = serializers.SerializerMethodField()
+    profile_picture_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [
             'id', 'username', 'full_name', 'age', 'gender',
-            'alzheimer_level', 'phone_number', 'profile_picture'
+            'alzheimer_level', 'phone_number', 'profile_picture',
+            'profile_picture_variants'
         ]
         read_only_fields = fields
     
@@ -79,6 +89,9 @@ class PatientInfoSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.profile_picture.url)
             return obj.profile_picture.url
         return None
+    
+    def get_profile_picture_variants(self, obj):
+        return avatar_urls(obj, self.context.get('request'))
 
 
 class CaregiverSerializer(serializers.ModelSerializer):
@@ -86,12 +99,14 @@ class CaregiverSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField()
     disponible = serializers.SerializerMethodField()
+    active_assignments = serializers.SerializerMethodField()
+    distance_meters = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [
             'id', 'full_name', 'avatar', 'phone_number', 
-            'email', 'disponible'
+            'email', 'disponible', 'active_assignments', 'distance_meters'
         ]
         read_only_fields = fields
     
@@ -106,4 +121,11 @@ class CaregiverSerializer(serializers.ModelSerializer):
     
     def get_disponible(self, obj):
         # A caregiver is available if they don't have a patient assigned
-        return obj.patient is None
+        return obj.patient_id is None
+    
+    def get_active_assignments(self, obj):
+        # Set by matching.rank_candidates
+        return getattr(obj, 'active_assignments', None)
+    
+    def get_distance_meters(self, obj):
+        return getattr(obj, 'distance_meters', None)
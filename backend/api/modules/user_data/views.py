@@ -1,12 +1,17 @@
-import os
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from .serializers import UserDataSerializer, ProfilePictureSerializer, PatientInfoSerializer, CaregiverSerializer
+from ..media.avatars import avatar_names, discard_avatar, main_variant, store_avatar
+from ..media.processing import DECODE_ERRORS
 from ..user.models import User
+from ..user.relationships import invalidate_patient
 
 
 class UserDataView(generics.RetrieveUpdateAPIView):
@@ -49,13 +54,19 @@ class UploadProfilePictureView(APIView):
         if serializer.is_valid():
             user = request.user
             
-            if user.profile_picture:
-                old_picture_path = user.profile_picture.path
-                if os.path.exists(old_picture_path):
-                    os.remove(old_picture_path)
-            
-            user.profile_picture = serializer.validated_data['profile_picture']
-            user.save()
+            try:
+                with transaction.atomic():
+                    variants = store_avatar(serializer.validated_data['profile_picture'])
+                    stale = avatar_names(user)
+                    user.profile_picture = main_variant(variants)
+                    user.profile_picture_variants = variants
+                    user.save(update_fields=['profile_picture', 'profile_picture_variants'])
+                    # Old blobs are collected once unreferenced; legacy files are deleted
+                    transaction.on_commit(lambda: discard_avatar(*stale))
+            except DECODE_ERRORS:
+                return Response({
+                    'profile_picture': ['No se pudo procesar la imagen.']
+                }, status=status.HTTP_400_BAD_REQUEST)
             
             user_serializer = UserDataSerializer(user)
             return Response({
@@ -74,12 +85,11 @@ class DeleteProfilePictureView(APIView):
         user = request.user
         
         if user.profile_picture:
-            picture_path = user.profile_picture.path
-            if os.path.exists(picture_path):
-                os.remove(picture_path)
-            
+            stale = avatar_names(user)
             user.profile_picture = None
-            user.save()
+            user.profile_picture_variants = {}
+            user.save(update_fields=['profile_picture', 'profile_picture_variants'])
+            transaction.on_commit(lambda: discard_avatar(*stale))
             
             return Response({
                 'message': 'Foto de perfil eliminada exitosamente.'
@@ -129,8 +139,11 @@ class AssignCaregiverToPatientView(APIView):
                 'error': 'Paciente no encontrado.'
             }, status=status.HTTP_404_NOT_FOUND)
         
+        previous_patient_id = user.patient_id
         user.patient = patient
         user.save()
+        if previous_patient_id != patient.id:
+            invalidate_patient(previous_patient_id)
         
         return Response({
             'message': f'Asignado exitosamente a {patient.first_name} {patient.last_name}'.strip(),
@@ -150,21 +163,26 @@ class UnassignPatientView(APIView):
                 'error': 'Solo los cuidadores pueden desvincular pacientes.'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        if not user.patient:
+        if not user.patient_id:
             return Response({
                 'error': 'No hay paciente asignado actualmente.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # 🗑️ Eliminar zona segura y historial de ubicaciones del paciente
-        from ..safe_zone.models import SafeZone, LocationHistory
+        from ..safe_zone.models import SafeZone, LocationHistory, LocationTrack
+        from ..safe_zone import geofence
         
-        patient = user.patient
-        SafeZone.objects.filter(user=patient).delete()
-        LocationHistory.objects.filter(user=patient).delete()
+        patient_id = user.patient_id
+        SafeZone.objects.filter(user_id=patient_id).delete()
+        LocationHistory.objects.filter(user_id=patient_id).delete()
+        LocationTrack.objects.filter(user_id=patient_id).delete()
+        geofence.invalidate_zone(patient_id)
+        geofence.invalidate_state(patient_id)
         
         # Desvincular paciente
         user.patient = None
         user.save()
+        invalidate_patient(patient_id)
         
         return Response({
             'message': 'Paciente y zona segura desvinculados exitosamente.'
@@ -176,12 +194,7 @@ class DeleteAccountView(APIView):
     
     def delete(self, request):
         user = request.user
-        
-        if user.profile_picture:
-            picture_path = user.profile_picture.path
-            if os.path.exists(picture_path):
-                os.remove(picture_path)
-        
+        # The profile picture is released by the post_delete receiver
         user.delete()
         
         return Response({
@@ -193,15 +206,41 @@ class GetAvailableCaregiversView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-
-        available_caregivers = User.objects.filter(
-            user_type=User.UserType.CAREGIVER,
-            patient__isnull=True
-        ).exclude(id=request.user.id)  
+        # Ranked from the availability index: least loaded, then nearest to our patient's zone
+        from ..matching.services import rank_candidates, zone_coordinates
+        
+        # Optional ?start=&end= keeps only caregivers free in that window
+        window = None
+        if 'start' in request.query_params or 'end' in request.query_params:
+            try:
+                start, end = (
+                    parse_datetime(request.query_params.get(param, '')) for param in ('start', 'end')
+                )
+            except ValueError:
+                start = end = None
+            if start is None or end is None:
+                return Response({
+                    'error': 'Se requieren fechas de inicio y fin válidas.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            start, end = (
+                timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+                for moment in (start, end)
+            )
+            if start >= end:
+                return Response({
+                    'error': 'La fecha de fin debe ser posterior a la fecha de inicio.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            window = (start, end)
+        
+        available_caregivers = rank_candidates(
+            zone_coordinates(request.user.patient_id),
+            exclude_ids=[request.user.id],
+            window=window
+        )
         
         serializer = CaregiverSerializer(available_caregivers, many=True, context={'request': request})
         
         return Response({
             'caregivers': serializer.data,
-            'count': available_caregivers.count()
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            'count': len(available_caregivers)
+        }, status=status.HTTP_200_OK)
@@ -12,4 +12,5 @@ urlpatterns = [
     path('achievements/', include('api.modules.achievements.urls')),
     path('activities/', include('api.modules.activities.urls')),
     path('caregiver-log/', include('api.modules.caregiver_log.urls')),
+    path('metrics/', include('api.modules.metrics.urls')),
 ]
@@ -3,6 +3,11 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The caregiver location stream (/api/safe-zone/location/stream/) is a
+long-lived async response and must be served through this application,
+e.g. ``uvicorn core.asgi:application``. With the default in-process broker
+run a single worker process, or configure LOCATION_STREAM_BROKER.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.modules.metrics.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -99,6 +100,25 @@ DATABASES = {
     }
 }
 
+# Cache
+# Shared by the geofence engine and other per-patient caches. Multi-process
+# deployments must use a shared backend (set REDIS_URL) so that invalidation
+# reaches every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'remember-you',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -141,7 +161,7 @@ AUTH_USER_MODEL = 'api.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.modules.user.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication'
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -155,6 +175,19 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),     
     'ROTATE_REFRESH_TOKENS': True,       
     'BLACKLIST_AFTER_ROTATION': True, 
+    'TOKEN_REFRESH_SERIALIZER': 'api.modules.user.tokens.FastTokenRefreshSerializer',
+}
+
+# Refresh tokens are checked against a per-process Bloom filter of the
+# blacklist, refreshed every SYNC_SECONDS; `manage.py purge_expired_tokens`
+# deletes expired outstanding/blacklisted rows in batches. The filter is only
+# used with a shared cache (REDIS_URL): with the default LocMemCache a token
+# rotated in another worker would be invisible until the next sync, so every
+# refresh is checked against the database instead.
+AUTH_BLACKLIST_BLOOM = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.01,
+    'SYNC_SECONDS': 30,
 }
 
 DJOSER = {
@@ -166,4 +199,74 @@ DJOSER = {
 }
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Push notifications
+# Queued alerts are delivered by an in-process thread pool, which re-arms a
+# timer for pending retries. Set
+# PUSH_DISPATCH_INLINE = False when running `manage.py dispatch_push_notifications`
+# as a separate worker.
+PUSH_DISPATCH_INLINE = True
+PUSH_DISPATCH_WORKERS = 2
+
+# Memory images
+# Each upload gets a WebP copy per size (longest side, px), rendered by an
+# in-process thread pool after commit. Set MEMORY_IMAGE_INLINE = False to
+# leave it to `manage.py generate_memory_variants`.
+MEMORY_IMAGE_VARIANTS = {
+    'thumb': 320,
+    'medium': 1280,
+}
+MEMORY_IMAGE_INLINE = True
+MEMORY_IMAGE_WORKERS = 2
+
+# Profile pictures are cropped square and stored at each size (px) as
+# content-addressed blobs under MEDIA_ROOT/blobs/. Unreferenced blobs are
+# deleted by `manage.py collect_media_blobs`.
+AVATAR_SIZES = {
+    'large': 512,
+    'small': 128,
+}
+
+# Media under MEDIA_URL is served by api.modules.media.views, which checks
+# access first. Memory photos are private: serializers hand out URLs signed
+# for MEDIA_URL_TTL to MEDIA_URL_TTL * 2 seconds. Behind nginx, set
+# MEDIA_ACCEL_REDIRECT to an internal location aliased to MEDIA_ROOT, e.g.
+#   location /protected-media/ { internal; alias /path/to/media/; }
+# so authorized files are sent by nginx instead of a Python worker.
+MEDIA_URL_TTL = 60 * 60
+MEDIA_ACCEL_REDIRECT = None
+
+# Location history retention
+# Raw points older than RAW_DAYS are averaged into TRACK_BUCKET_SECONDS
+# buckets by `manage.py compact_location_history`; buckets older than
+# TRACK_DAYS are deleted.
+LOCATION_HISTORY_RETENTION = {
+    'RAW_DAYS': 7,
+    'TRACK_BUCKET_SECONDS': 300,
+    'TRACK_DAYS': 180,
+}
+
+# Consecutive pings within DISTANCE_METERS of a stored point, no more than
+# MAX_GAP_SECONDS apart and in the same zone state, are merged into that row
+# as a dwell instead of inserting a new one.
+LOCATION_DWELL = {
+    'DISTANCE_METERS': 20,
+    'MAX_GAP_SECONDS': 120,
+}
+
+# Request metrics, served to staff at /api/metrics/
+# Requests slower than METRICS_SLOW_REQUEST_MS are printed with their SQL;
+# set it to None to disable the slow-request log.
+METRICS_ENABLED = True
+METRICS_SLOW_REQUEST_MS = 1000
+
+# Token-bucket rate limits per endpoint scope (api.modules.throttling).
+# Each user gets CAPACITY requests of burst, refilled at REFILL_PER_SECOND;
+# rejected requests get 429 with Retry-After.
+RATE_LIMITS = {
+    # Devices report every 5-10 s; allows foreground + background tasks and short bursts
+    'location_update': {'CAPACITY': 10, 'REFILL_PER_SECOND': 0.5},
+    # Offline queue replays: one batch per reconnect, a few retries
+    'location_batch': {'CAPACITY': 5, 'REFILL_PER_SECOND': 1 / 30},
+}
@@ -9,7 +9,7 @@ export default function RecuerdoCard({ memory, onPress, onLongPress, themeStyles
       onPress={onPress}
       onLongPress={onLongPress}
     >
-      {memory.image && <Image source={{ uri: memory.image }} style={styles.memoryImage} />}
+      {memory.image && <Image source={{ uri: memory.image_variants?.thumb || memory.image }} style={styles.memoryImage} />}
       <View style={styles.memoryInfo}>
         <Text style={[styles.memoryTitle, themeStyles.text, { fontSize: getFontSize(14) }]}>
           {memory.title}
@@ -1,9 +1,9 @@
 // src/hooks/useZonaSegura.js
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import { useFocusEffect } from "@react-navigation/native";
 import { Vibration, Alert } from "react-native";
 import AsyncStorage from "@react-native-async-storage/async-storage";
-import { calcularDistancia } from "../utils/helpers";
+import { calcularDistancia, combinarHistorial } from "../utils/helpers";
 import useAudioAlert from "./useAudioAlert";
 import api from "../api/axiosInstance";
 
@@ -48,17 +48,26 @@ export default function useZonaSegura(paciente) {
   );
 
 
-  /** 🔹 Actualizar ubicación del paciente cada 5 segundos */
+  /** 🔹 Actualizar ubicación del paciente cada 5 segundos (solo puntos nuevos) */
+  const cursorRef = useRef("");
+  const puntosRef = useRef([]);
+
   useEffect(() => {
     const interval = setInterval(async () => {
       try {
-        const res = await api.get('/api/safe-zone/location/history/');
-        const history = res.data;
+        const res = await api.get('/api/safe-zone/location/history/', {
+          params: { since: cursorRef.current },
+        });
+        const { results, next_cursor } = res.data;
+        cursorRef.current = next_cursor || "";
 
-        if (history && history.length > 0) {
-          const latest = history[0];
+        if (results && results.length > 0) {
+          const history = combinarHistorial(puntosRef.current, results)
+            .filter(p => p.latitude !== undefined && p.longitude !== undefined);
+          puntosRef.current = history;
 
-          if (latest && latest.latitude !== undefined && latest.longitude !== undefined) {
+          const latest = history[0];
+          if (latest) {
             setUbicacionPaciente({
               latitude: parseFloat(latest.latitude),
               longitude: parseFloat(latest.longitude),
@@ -66,12 +75,10 @@ export default function useZonaSegura(paciente) {
           }
 
           // Guardar historial completo para mostrar breadcrumbs
-          const puntos = history
-            .filter(p => p.latitude !== undefined && p.longitude !== undefined)
-            .map(p => ({
-              latitude: parseFloat(p.latitude),
-              longitude: parseFloat(p.longitude),
-            }));
+          const puntos = history.map(p => ({
+            latitude: parseFloat(p.latitude),
+            longitude: parseFloat(p.longitude),
+          }));
           setHistorial(puntos);
         }
       } catch (error) {
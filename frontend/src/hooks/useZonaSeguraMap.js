@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from "react";
 import { Alert, Animated } from "react-native";
 import AsyncStorage from "@react-native-async-storage/async-storage";
 import api from "../api/axiosInstance";
+import { combinarHistorial } from "../utils/helpers";
 
 export default function useZonaSegura() {
   const [centro, setCentro] = useState(null);
@@ -81,12 +82,22 @@ export default function useZonaSegura() {
   useEffect(() => {
     let interval;
     if (centro) {
+      // Cursor incremental: cada poll solo descarga los puntos nuevos
+      let cursor = "";
+      let puntos = [];
+
       const fetchLocation = async () => {
         try {
-          const res = await api.get('/api/safe-zone/location/history/');
-          const history = res.data;
+          const res = await api.get('/api/safe-zone/location/history/', {
+            params: { since: cursor },
+          });
+          const { results, next_cursor } = res.data;
+          cursor = next_cursor || "";
+
+          if (results && results.length > 0) {
+            puntos = combinarHistorial(puntos, results);
+            const history = puntos;
 
-          if (history && history.length > 0) {
             // La más reciente es la primera (según ordenamiento del backend)
             const latest = history[0];
 
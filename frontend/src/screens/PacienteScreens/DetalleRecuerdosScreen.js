@@ -65,7 +65,7 @@ export default function DetalleRecuerdosScreen({ route, navigation }) {
               activeOpacity={0.9}
               style={styles.imageContainer}
             >
-              <Image source={{ uri: memory.image }} style={styles.image} />
+              <Image source={{ uri: memory.image_variants?.medium || memory.image }} style={styles.image} />
               <View style={styles.expandIcon}>
                 <Ionicons name="expand-outline" size={20} color="#FFF" />
               </View>
@@ -35,7 +35,7 @@ const MemoryCard = ({ memory, onPress, onLongPress, index, getFontSizeStyle }) =
         activeOpacity={0.9}
       >
         <View style={styles.imageContainer}>
-          <Image source={{ uri: memory.image }} style={styles.cardImage} />
+          <Image source={{ uri: memory.image_variants?.thumb || memory.image }} style={styles.cardImage} />
         </View>
         <View style={styles.textContainer}>
           <Text style={[styles.cardTitle, getFontSizeStyle(14)]} numberOfLines={1}>
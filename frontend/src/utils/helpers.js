@@ -16,3 +16,18 @@ export const formatearFecha = (fecha) => {
     return fecha;
   }
 };
+
+/**
+ * Combina puntos nuevos del historial de ubicaciones con los ya conocidos.
+ * Reemplaza por location_id, ordena del más reciente al más antiguo y limita el total.
+ * @param {Array} actuales - Puntos ya cargados
+ * @param {Array} nuevos - Puntos devueltos por ?since=
+ * @param {number} limite - Máximo de puntos a conservar
+ */
+export const combinarHistorial = (actuales, nuevos, limite = 100) => {
+  const porId = new Map(actuales.map((p) => [p.location_id, p]));
+  nuevos.forEach((p) => porId.set(p.location_id, p));
+  return Array.from(porId.values())
+    .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp))
+    .slice(0, limite);
+};
@@ -16,6 +16,19 @@ let lastZoneState = null; // ✅ FIX CRÍTICO #3: Trackear último estado conoci
 // ✅ FIX CRÍTICO #2: Queue de retry para ubicaciones fallidas
 const MAX_QUEUE_SIZE = 50;
 let isProcessingQueue = false;
+let queuePausedUntil = 0; // El servidor pidió esperar (429 + Retry-After)
+
+/**
+ * Si el servidor limitó la tasa, pausa la queue el tiempo indicado en Retry-After
+ * @returns {boolean} true si la respuesta fue un 429
+ */
+function handleRateLimit(error) {
+    if (error?.response?.status !== 429) return false;
+    const retryAfter = parseInt(error.response.headers?.['retry-after'], 10);
+    queuePausedUntil = Date.now() + (Number.isFinite(retryAfter) ? retryAfter : 30) * 1000;
+    console.log(`[Queue] ⏳ Servidor ocupado, reintentando en ${Math.round((queuePausedUntil - Date.now()) / 1000)}s`);
+    return true;
+}
 
 /**
  * Guarda una ubicación fallida en la queue
@@ -48,7 +61,7 @@ async function addToQueue(locationData) {
  * Procesa la queue de ubicaciones pendientes con retry exponencial
  */
 async function processQueue() {
-    if (isProcessingQueue) return;
+    if (isProcessingQueue || Date.now() < queuePausedUntil) return;
     isProcessingQueue = true;
 
     try {
@@ -66,35 +79,52 @@ async function processQueue() {
 
         console.log(`[Queue] Procesando ${queue.length} ubicaciones pendientes...`);
 
-        const successfulItems = [];
-        const failedItems = [];
-
+        // Exponential backoff: 2^retryCount segundos
+        const dueItems = [];
+        const pendingItems = [];
         for (const item of queue) {
-            try {
-                // Exponential backoff: 2^retryCount segundos
-                const backoffDelay = Math.pow(2, item.retryCount) * 1000;
-                const timeSinceAdded = Date.now() - item.timestamp;
+            const backoffDelay = Math.pow(2, item.retryCount) * 1000;
+            const timeSinceAdded = Date.now() - item.timestamp;
 
-                if (timeSinceAdded < backoffDelay) {
-                    failedItems.push(item); // Aún no es tiempo de reintentar
-                    continue;
-                }
+            if (timeSinceAdded < backoffDelay) {
+                pendingItems.push(item); // Aún no es tiempo de reintentar
+            } else {
+                dueItems.push(item);
+            }
+        }
 
-                await api.post('/api/safe-zone/location/update/', {
-                    latitude: item.latitude,
-                    longitude: item.longitude,
-                    is_out_of_zone: item.is_out_of_zone
+        let successfulItems = [];
+        let failedItems = pendingItems;
+
+        if (dueItems.length > 0) {
+            try {
+                // Un solo request con todas las ubicaciones pendientes, en orden
+                await api.post('/api/safe-zone/location/batch/', {
+                    points: dueItems.map(item => ({
+                        latitude: item.latitude,
+                        longitude: item.longitude,
+                        is_out_of_zone: item.is_out_of_zone,
+                        recorded_at: new Date(item.timestamp).toISOString()
+                    }))
                 });
 
-                successfulItems.push(item);
-                console.log(`[Queue] ✅ Ubicación reenviada exitosamente`);
+                successfulItems = dueItems;
+                console.log(`[Queue] ✅ ${dueItems.length} ubicaciones reenviadas en lote`);
 
             } catch (error) {
-                // Incrementar retry count si no ha alcanzado el máximo
-                if (item.retryCount < 5) {
-                    failedItems.push({ ...item, retryCount: item.retryCount + 1 });
+                if (handleRateLimit(error)) {
+                    // Limitado por el servidor: no cuenta como reintento fallido
+                    failedItems = [...pendingItems, ...dueItems];
                 } else {
-                    console.log(`[Queue] ❌ Ubicación descartada después de 5 reintentos`);
+                    // Incrementar retry count si no ha alcanzado el máximo
+                    const retryItems = dueItems
+                        .filter(item => item.retryCount < 5)
+                        .map(item => ({ ...item, retryCount: item.retryCount + 1 }));
+
+                    if (retryItems.length < dueItems.length) {
+                        console.log(`[Queue] ❌ ${dueItems.length - retryItems.length} ubicaciones descartadas después de 5 reintentos`);
+                    }
+                    failedItems = [...pendingItems, ...retryItems];
                 }
             }
         }
@@ -135,6 +165,7 @@ async function sendLocationWithRetry(latitude, longitude, isOutOfZone) {
 
     } catch (error) {
         console.error('[Location] Error enviando ubicación:', error);
+        handleRateLimit(error);
 
         // ✅ FIX CRÍTICO #2: Agregar a queue para reintentar después
         await addToQueue({